@@ -0,0 +1,217 @@
+"""
+AI4Sarcopenia Literature Daily - asyncio fetch engine
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Runs the HTTP work of a run (arXiv and Europe PMC searches, code-link
+lookups, link and metadata refresh) as coroutines on one asyncio event
+loop in a background thread. The pipeline itself stays synchronous:
+submit() returns concurrent.futures.Future objects and stream() turns an
+async result stream into an iterator, so the engine takes the place of the
+worker pools. Hundreds of lookups can wait for their host on one thread;
+host limits, token buckets and retries are those of http_client.
+
+Selected with `fetch_engine: 'async'` in config.yaml; needs httpx.
+"""
+
+import queue
+import asyncio
+import logging
+import datetime
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import urlencode
+
+import http_client
+from paper_model import Paper
+
+_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'arxiv': 'http://arxiv.org/schemas/atom',
+    'opensearch': 'http://a9.com/-/spec/opensearch/1.1/',
+}
+
+ARXIV_PAGE_SIZE = 100
+
+# Marks the end of an async result stream
+_END_OF_STREAM = object()
+
+
+def _timestamp(value):
+    """Aware UTC datetime of an Atom timestamp such as 2025-01-31T18:59:59Z."""
+    return datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+
+
+def parse_arxiv_feed(content):
+    """
+    Parse an arXiv API Atom response.
+
+    Args:
+        content: Response body (bytes)
+
+    Returns:
+        Tuple of (total number of results, list of Paper)
+    """
+    root = ET.fromstring(content)
+    total = int(root.findtext('opensearch:totalResults', '0', _NS).strip() or 0)
+    papers = []
+    for entry in root.iterfind('atom:entry', _NS):
+        entry_id = entry.findtext('atom:id', None, _NS)
+        published = entry.findtext('atom:published', None, _NS)
+        if not entry_id or not published:
+            continue
+        updated = entry.findtext('atom:updated', None, _NS)
+        papers.append(Paper(
+            'arxiv', entry_id.split('arxiv.org/abs/')[-1],
+            ' '.join((entry.findtext('atom:title', '', _NS)).split()),
+            summary=entry.findtext('atom:summary', '', _NS),
+            authors=[author.findtext('atom:name', '', _NS)
+                     for author in entry.iterfind('atom:author', _NS)],
+            doi=entry.findtext('arxiv:doi', None, _NS),
+            entry_id=entry_id,
+            comment=entry.findtext('arxiv:comment', None, _NS),
+            published=_timestamp(published),
+            updated=_timestamp(updated) if updated else None))
+    return total, papers
+
+
+class AsyncEngine:
+    """
+    Event loop thread with an http_client.AsyncSession.
+
+    Usage:
+        with AsyncEngine() as engine:
+            future = engine.submit(coroutine)
+            for paper in engine.stream(engine.search_arxiv(url_format, query, 50)):
+                ...
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever,
+                                        name='async-engine', daemon=True)
+        self._thread.start()
+        self.session = self.call(self._open_session())
+
+    @staticmethod
+    async def _open_session():
+        return http_client.AsyncSession()
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the engine's loop; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call(self, coroutine):
+        """Run a coroutine on the engine's loop and wait for its result."""
+        return self.submit(coroutine).result()
+
+    def stream(self, results, label=None, buffer=1000):
+        """
+        Iterate over an async generator from synchronous code.
+
+        The generator starts right away and reads ahead up to `buffer`
+        items, so streams created one after another fetch concurrently.
+        Closing the returned iterator cancels the generator.
+
+        Args:
+            results: Async generator
+            label: If given, a failure is logged as "<label> failed" and
+                ends the stream; otherwise it is raised to the reader
+            buffer: Maximum number of items read ahead
+        """
+        items = queue.Queue()
+        # Free buffer places; the consumer gives them back from its thread
+        slots = asyncio.Semaphore(buffer)
+
+        async def produce():
+            try:
+                async for item in results:
+                    await slots.acquire()
+                    items.put(item)
+            except Exception as e:
+                # Exceptions are never stream items
+                items.put(e)
+                return
+            finally:
+                await results.aclose()
+            items.put(_END_OF_STREAM)
+
+        task = self.submit(produce())
+
+        def consume():
+            try:
+                while True:
+                    item = items.get()
+                    if item is _END_OF_STREAM:
+                        return
+                    if isinstance(item, Exception):
+                        if label is None:
+                            raise item
+                        logging.error(f"{label} failed: {item}")
+                        return
+                    self.loop.call_soon_threadsafe(slots.release)
+                    yield item
+            finally:
+                task.cancel()
+
+        return consume()
+
+    def close(self):
+        self.call(self.session.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def search_arxiv(self, url_format, query='', max_results=10, id_list=None,
+                           page_size=ARXIV_PAGE_SIZE):
+        """
+        Stream arXiv search results, newest first (async generator).
+
+        Args:
+            url_format: API URL with a '{}' placeholder for the query string
+            query: arXiv search query
+            max_results: Maximum number of results
+            id_list: Optional arXiv IDs to fetch instead of (or within) a search
+            page_size: Results per request
+
+        Yields:
+            Paper objects
+        """
+        start = 0
+        while start < max_results:
+            args = {'search_query': query, 'id_list': ','.join(id_list or []),
+                    'sortBy': 'submittedDate', 'sortOrder': 'descending',
+                    'start': start, 'max_results': min(page_size, max_results - start)}
+            response = await self.session.get(url_format.format(urlencode(args)), source='arxiv')
+            response.raise_for_status()
+            total, papers = parse_arxiv_feed(response.content)
+            for paper in papers[:max_results - start]:
+                yield paper
+            start += len(papers)
+            if not papers or start >= total:
+                return
+
+
+def open_engine(config):
+    """
+    Create the AsyncEngine if config.yaml selects `fetch_engine: 'async'`.
+
+    Returns:
+        AsyncEngine instance, or None for the thread pools (the default, and
+        the fallback when httpx is not installed)
+    """
+    if config.get('fetch_engine', 'threads') != 'async':
+        return None
+    if http_client.httpx is None:
+        logging.warning("fetch_engine: 'async' needs httpx (pip install httpx); using threads")
+        return None
+    logging.info("Fetch engine: asyncio")
+    return AsyncEngine()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+"""
+AI4Sarcopenia Literature Daily - Offline pipeline benchmarks
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Measures throughput (papers per second) and peak Python memory of the main
+pipeline steps at several archive sizes, with all API calls answered by the
+local stub server (see stub_server.py):
+
+    get_daily_papers     search + code-link enrichment of `size` results
+    update_paper_links   code-link refresh of an archive without links
+    update_json_file     merge of a 1% batch into an archive of `size` papers
+    json_to_md           GitPage render (shards, search index) of the archive
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 100 1000 10000 100000
+    python benchmarks/bench_pipeline.py --latency-ms 50 --error-rate 0.05 --output bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json --max-slowdown 1.3
+    python benchmarks/bench_pipeline.py --engine async --sizes 100 1000
+
+The network-bound benchmarks only run up to --network-limit papers. With
+--baseline, the run fails if a benchmark became slower than allowed.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import yaml
+
+import daily_arxiv
+from paper_store import new_record, load_papers, save_papers
+from async_engine import AsyncEngine
+from github_resolver import GitHubResolver
+from stub_server import StubServer, make_corpus
+
+BENCHMARKS = ('get_daily_papers', 'update_paper_links', 'update_json_file', 'json_to_md')
+NETWORK_BENCHMARKS = ('get_daily_papers', 'update_paper_links')
+
+
+def topic_names():
+    """Topic names of config.yaml, so archives look like the real one."""
+    with open(os.path.join(ROOT, 'config.yaml'), 'r', encoding='utf-8') as f:
+        return list(yaml.safe_load(f)['keywords'])
+
+
+def to_record(paper, code_url=True):
+    url = (f"http://arxiv.org/abs/{paper['key']}" if paper['source'] == 'arxiv'
+           else f"https://europepmc.org/article/MED/{paper['key']}")
+    return new_record(paper['key'], paper['published'].date(), paper['title'], paper['author'],
+                      url, code_url=paper['code_url'] if code_url else None,
+                      source=paper['source'], abstract=paper['abstract'])
+
+
+def make_archive(papers, topics, code_url=True):
+    """Paper store of a corpus; every paper in one topic, every fifth in a second one."""
+    archive = {topic: {} for topic in topics}
+    for i, paper in enumerate(papers):
+        record = to_record(paper, code_url)
+        archive[topics[i % len(topics)]][paper['key']] = record
+        if i % 5 == 0:
+            archive[topics[(i + 1) % len(topics)]][paper['key']] = record
+    return archive
+
+
+class Context:
+    """State shared by the benchmarks of one run."""
+
+    def __init__(self, args, stub, workdir, engine=None):
+        self.args = args
+        self.stub = stub
+        self.workdir = workdir
+        self.engine = engine
+        self.topics = topic_names()
+        self.recorded = []
+        if args.recorded and os.path.exists(args.recorded):
+            seen = set()
+            for papers in load_papers(args.recorded).values():
+                for key, record in papers.items():
+                    if key not in seen:
+                        seen.add(key)
+                        self.recorded.append(record)
+
+    def corpus(self, size):
+        return make_corpus(size, self.recorded, seed=self.args.seed)
+
+    def path(self, name):
+        return os.path.join(self.workdir, name)
+
+
+# Each benchmark prepares its input and returns the function to measure;
+# preparation is not timed and is repeated for the memory measurement.
+
+def bench_get_daily_papers(ctx, size):
+    ctx.stub.load(ctx.corpus(size))
+    github = GitHubResolver(ctx.stub.endpoints()['endpoints']['github'])
+    return lambda: daily_arxiv.get_daily_papers('Benchmark', 'sarcopenia', max_results=size,
+                                                github=github, engine=ctx.engine)
+
+def bench_update_paper_links(ctx, size):
+    corpus = ctx.corpus(size)
+    ctx.stub.load(corpus)
+    filename = ctx.path('links.json')
+    save_papers(filename, make_archive(corpus, ctx.topics, code_url=False))
+    return lambda: daily_arxiv.update_paper_links(filename, max_workers=ctx.args.workers,
+                                                  engine=ctx.engine)
+
+def bench_update_json_file(ctx, size):
+    corpus = ctx.corpus(size + max(10, size // 100))
+    filename = ctx.path('merge.json')
+    save_papers(filename, make_archive(corpus[:size], ctx.topics))
+    batch = [make_archive(corpus[size:], ctx.topics)]
+    return lambda: daily_arxiv.update_json_file(filename, batch)
+
+def bench_json_to_md(ctx, size):
+    filename = ctx.path('render.json')
+    save_papers(filename, make_archive(ctx.corpus(size), ctx.topics))
+    return lambda: daily_arxiv.json_to_md(filename, ctx.path('index.md'), task='Benchmark',
+                                          to_web=True, use_tc=False, use_b2t=False,
+                                          search_index=ctx.path('search-index.json'),
+                                          max_rows=50, shards=ctx.path('data'))
+
+
+def measure(prepare, ctx, size, memory=True):
+    """
+    Time one benchmark, then run it again under tracemalloc for its peak memory.
+
+    Returns:
+        Dictionary of seconds, papers per second, peak MiB and requests sent
+    """
+    run = prepare(ctx, size)
+    ctx.stub.reset_counts()
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    requests = sum(ctx.stub.requests.values())
+    errors = sum(ctx.stub.errors.values())
+
+    peak = None
+    if memory:
+        run = prepare(ctx, size)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return {'seconds': round(seconds, 3),
+            'papers_per_second': round(size / seconds, 1) if seconds else None,
+            'peak_mib': round(peak, 1) if peak is not None else None,
+            'requests': requests,
+            'injected_errors': errors}
+
+
+def compare(results, baseline, max_slowdown):
+    """Benchmarks that got slower than max_slowdown times their baseline."""
+    previous = {(r['benchmark'], r['size']): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result['benchmark'], result['size']))
+        if before and before['seconds'] and result['seconds'] > before['seconds'] * max_slowdown:
+            regressions.append((result, result['seconds'] / before['seconds']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks of the paper pipeline')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='Archive sizes (papers)')
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--network-limit', type=int, default=1000,
+                        help='Largest size run by the benchmarks that call the APIs')
+    parser.add_argument('--latency-ms', type=float, default=5.0,
+                        help='Latency added to every stub server response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help='Maximum random extra latency per response')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of requests answered with HTTP 503')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Worker threads of update_paper_links')
+    parser.add_argument('--engine', choices=('threads', 'async'), default='threads',
+                        help='Fetch engine of the network-bound benchmarks (async needs httpx)')
+    parser.add_argument('--recorded', default=os.path.join(ROOT, 'docs', 'sarcopenia-arxiv-daily.json'),
+                        help='Archive whose papers start the corpus (recorded fixtures)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc run (halves the run time)')
+    parser.add_argument('--output', help='Write the results as JSON')
+    parser.add_argument('--baseline', help='Results JSON of an earlier run to compare with')
+    parser.add_argument('--max-slowdown', type=float, default=1.25,
+                        help='Allowed slowdown factor against the baseline')
+    args = parser.parse_args()
+
+    # Retries of injected errors would drown the table
+    logging.getLogger().setLevel(logging.ERROR)
+    stub = StubServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                      error_rate=args.error_rate, seed=args.seed)
+    results = []
+    with stub, tempfile.TemporaryDirectory() as workdir:
+        daily_arxiv.configure_endpoints(stub.endpoints())
+        daily_arxiv.configure_http({'backoff_factor': 0.05, 'max_backoff': 1})
+        # The stand-in server needs no request spacing (it has no token bucket)
+        daily_arxiv.arxiv_client.delay_seconds = 0
+        engine = AsyncEngine() if args.engine == 'async' else None
+        ctx = Context(args, stub, workdir, engine)
+
+        print(f"{'Benchmark':<20}{'Papers':>8}{'Seconds':>10}{'Papers/s':>11}"
+              f"{'Peak MiB':>10}{'Requests':>10}{'Errors':>8}")
+        for name in args.benchmarks:
+            prepare = globals()[f"bench_{name}"]
+            for size in args.sizes:
+                if name in NETWORK_BENCHMARKS and size > args.network_limit:
+                    continue
+                result = {'benchmark': name, 'size': size,
+                          **measure(prepare, ctx, size, memory=not args.no_memory)}
+                results.append(result)
+                peak = f"{result['peak_mib']:.1f}" if result['peak_mib'] is not None else '-'
+                print(f"{name:<20}{size:>8}{result['seconds']:>10.2f}"
+                      f"{result['papers_per_second'] or 0:>11.0f}{peak:>10}"
+                      f"{result['requests']:>10}{result['injected_errors']:>8}", flush=True)
+        if engine is not None:
+            engine.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'latency_ms': args.latency_ms, 'error_rate': args.error_rate,
+                       'results': results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.max_slowdown)
+        for result, factor in regressions:
+            print(f"REGRESSION {result['benchmark']} ({result['size']} papers): {factor:.2f}x slower")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
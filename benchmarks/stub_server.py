@@ -0,0 +1,283 @@
+"""
+AI4Sarcopenia Literature Daily - Local stand-in for the paper APIs
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Serves arXiv (Atom feed), Europe PMC (JSON with cursorMark paging),
+paperswithcode and GitHub search responses from an in-memory corpus, with
+configurable latency and error injection, so the pipeline can be measured
+without network access. The corpus starts with the papers recorded in the
+archive (real titles, authors, dates and code links) and is filled up with
+synthetic papers. Queries are not evaluated: every search returns the
+whole corpus of its source, newest first.
+
+Routes (see endpoints()):
+    /arxiv/query              arXiv API (search_query or id_list, start, max_results)
+    /europepmc/search         Europe PMC REST search (cursorMark, pageSize)
+    /pwc/<arXiv ID>           paperswithcode paper lookup
+    /github/search            GitHub repository search (q, OR'ed quoted terms)
+"""
+
+import json
+import time
+import random
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from xml.sax.saxutils import escape, quoteattr
+
+_WORDS = (
+    'sarcopenia', 'skeletal', 'muscle', 'body', 'composition', 'deep', 'learning',
+    'segmentation', 'CT', 'MRI', 'DXA', 'ultrasound', 'frailty', 'older', 'adults',
+    'prediction', 'automated', 'assessment', 'cachexia', 'cancer', 'lean', 'mass',
+    'network', 'transformer', 'radiomics', 'wearable', 'gait', 'grip', 'strength',
+    'index', 'L3', 'vertebra', 'opportunistic', 'screening', 'multi-center', 'cohort',
+)
+_NAMES = ('Wang', 'Smith', 'Kim', 'Garcia', 'Chen', 'Müller', 'Rossi', 'Tanaka',
+          'Nguyen', 'Kowalski', 'Silva', 'Ahmed', 'Dubois', 'Ivanova', 'Okafor')
+
+_ATOM_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<feed xmlns="http://www.w3.org/2005/Atom"'
+                ' xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"'
+                ' xmlns:arxiv="http://arxiv.org/schemas/atom">\n')
+
+
+def make_corpus(size, recorded=(), seed=0):
+    """
+    Papers served by the stub server, newest first.
+
+    Args:
+        size: Number of papers
+        recorded: Stored paper records (see paper_store.FIELDS) used first
+        seed: Random seed of the synthetic papers
+
+    Returns:
+        List of paper dictionaries (key, source, title, author, abstract,
+        published, doi, code_url)
+    """
+    rng = random.Random(seed)
+    recorded = list(recorded)
+    newest = datetime.datetime(2025, 12, 31, 12)
+    papers = []
+    for i in range(size):
+        if i < len(recorded):
+            record = recorded[i]
+            source = 'arxiv' if record.get('source', 'arxiv') == 'arxiv' else 'MED'
+            title = record['title']
+            author = record.get('first_author') or rng.choice(_NAMES)
+            code_url = record.get('code_url')
+        else:
+            source = 'MED' if i % 4 == 0 else 'arxiv'
+            title = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14))).capitalize()
+            author = f"{rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(_NAMES)}"
+            code_url = f"https://github.com/lab{i % 997}/paper-{i}" if rng.random() < 0.3 else None
+        if source == 'arxiv':
+            key = f"{25 - i // 100000:02d}01.{i % 100000:05d}"
+        else:
+            key = str(30000000 + i)
+        papers.append({
+            'key': key,
+            'source': source,
+            'title': title,
+            'author': author,
+            'abstract': ' '.join(rng.choice(_WORDS) for _ in range(60)),
+            'published': newest - datetime.timedelta(hours=i),
+            'doi': f"10.9999/bench.{i}" if i % 3 == 0 else None,
+            'code_url': code_url,
+        })
+    return papers
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; without this, Nagle's algorithm
+    # and delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        parts = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        route = parts.path.strip('/').split('/')[0]
+        stub.wait()
+        if stub.inject_error(route):
+            self._send(503, b'{"message": "injected error"}', 'application/json',
+                       {'Retry-After': '0'})
+            return
+        if route == 'arxiv':
+            self._send(200, stub.arxiv_feed(params).encode('utf-8'), 'application/atom+xml')
+        elif route == 'europepmc':
+            self._send_json(stub.europepmc_page(params))
+        elif route == 'pwc':
+            self._send_json(stub.pwc_paper(parts.path.rsplit('/', 1)[-1]))
+        elif route == 'github':
+            self._send_json(stub.github_search(params.get('q', '')))
+        else:
+            self._send(404, b'{"message": "not found"}', 'application/json')
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode('utf-8'), 'application/json')
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer:
+    """
+    Threaded local HTTP server answering like the paper APIs.
+
+    Usage:
+        with StubServer(make_corpus(1000), latency=0.02, error_rate=0.01) as stub:
+            daily_arxiv.configure_endpoints(stub.endpoints())
+    """
+
+    def __init__(self, papers=(), latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        """
+        Args:
+            papers: Corpus (see make_corpus)
+            latency: Seconds added to every response
+            jitter: Maximum random extra seconds per response
+            error_rate: Share of requests answered with 503 (Retry-After: 0)
+            seed: Random seed of jitter and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = dict()    # route -> count
+        self.errors = dict()      # route -> injected errors
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.load(papers)
+
+    def load(self, papers):
+        """Serve another corpus."""
+        self.arxiv = [p for p in papers if p['source'] == 'arxiv']
+        self.europepmc = [p for p in papers if p['source'] != 'arxiv']
+        self.by_key = {p['key']: p for p in self.arxiv}
+        self.by_title = {p['title'].lower(): p for p in papers}
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def endpoints(self):
+        """Config entries pointing daily_arxiv.configure_endpoints() at this server."""
+        return {'base_url': f"{self.url}/pwc/",
+                'endpoints': {'arxiv': f"{self.url}/arxiv/query",
+                              'europepmc': f"{self.url}/europepmc/search",
+                              'github': f"{self.url}/github/search"}}
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+            self.errors.clear()
+
+    def wait(self):
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def inject_error(self, route):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors[route] = self.errors.get(route, 0) + 1
+                return True
+        return False
+
+    def arxiv_feed(self, params):
+        start = int(params.get('start', 0))
+        count = int(params.get('max_results', 10))
+        if params.get('id_list'):
+            papers = [self.by_key[k] for k in params['id_list'].split(',') if k in self.by_key]
+        else:
+            papers = self.arxiv
+        entries = papers[start:start + count]
+        parts = [_ATOM_HEADER,
+                 f"<opensearch:totalResults>{len(papers)}</opensearch:totalResults>\n"
+                 f"<opensearch:startIndex>{start}</opensearch:startIndex>\n"
+                 f"<opensearch:itemsPerPage>{len(entries)}</opensearch:itemsPerPage>\n"]
+        for p in entries:
+            stamp = p['published'].strftime('%Y-%m-%dT%H:%M:%SZ')
+            abs_url = f"http://arxiv.org/abs/{p['key']}v1"
+            doi = f"<arxiv:doi>{escape(p['doi'])}</arxiv:doi>" if p['doi'] else ''
+            parts.append(
+                f"<entry><id>{abs_url}</id><updated>{stamp}</updated>"
+                f"<published>{stamp}</published><title>{escape(p['title'])}</title>"
+                f"<summary>{escape(p['abstract'])}</summary>"
+                f"<author><name>{escape(p['author'])}</name></author>{doi}"
+                f"<link href={quoteattr(abs_url)} rel=\"alternate\" type=\"text/html\"/>"
+                "<arxiv:primary_category term=\"eess.IV\"/><category term=\"eess.IV\"/></entry>\n")
+        parts.append('</feed>\n')
+        return ''.join(parts)
+
+    def europepmc_page(self, params):
+        cursor = params.get('cursorMark', '*')
+        start = 0 if cursor == '*' else int(cursor)
+        size = int(params.get('pageSize', 25))
+        page = self.europepmc[start:start + size]
+        end = start + len(page)
+        results = [{
+            'id': p['key'],
+            'source': 'MED',
+            'title': p['title'],
+            'doi': p['doi'],
+            'abstractText': p['abstract'],
+            'firstPublicationDate': p['published'].strftime('%Y-%m-%d'),
+            'pubYear': str(p['published'].year),
+            'authorList': {'author': [{'fullName': p['author']}]},
+        } for p in page]
+        return {'hitCount': len(self.europepmc),
+                'nextCursorMark': str(end) if end < len(self.europepmc) else cursor,
+                'resultList': {'result': results}}
+
+    def pwc_paper(self, paper_id):
+        paper = self.by_key.get(paper_id.split('v')[0])
+        official = {'url': paper['code_url']} if paper and paper['code_url'] else None
+        return {'paper': paper_id, 'official': official}
+
+    def github_search(self, query):
+        """Repositories of the papers named by the (OR'ed, quoted) query terms."""
+        items = []
+        for term in query.split(' OR '):
+            term = term.strip().strip('"')
+            paper = self.by_key.get(term) or self.by_title.get(term.lower())
+            if paper is not None and paper['code_url']:
+                items.append({'name': paper['code_url'].rsplit('/', 1)[-1],
+                              'description': f"Code of {paper['title']} ({paper['key']})",
+                              'html_url': paper['code_url'],
+                              'stargazers_count': 0})
+        return {'total_count': len(items), 'items': items}
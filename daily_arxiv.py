@@ -13,14 +13,35 @@ Website: https://aizierjiang.github.io/AI4SarcopeniaLiteratureDaily
 
 import os
 import re
-import json
 import arxiv
 import yaml
 import logging
 import argparse
 import datetime
-import requests
-from europe_pmc import EuropePMCSearch, EuropePMCPaper
+import time
+import heapq
+import queue
+import itertools
+import functools
+import inspect
+from operator import attrgetter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from europe_pmc import EuropePMCSearch, EuropePMCHarvester
+from paper_model import Paper
+import run_report
+import http_client
+from http_client import configure_host_limits, configure_http, configure_rate_limits, host_slot
+from enrichment_cache import open_cache
+from paper_db import open_paper_db
+from github_resolver import open_github_resolver
+from async_engine import open_engine
+from run_journal import open_journal
+from topic_matcher import TopicMatcher
+from dedup import Deduplicator
+from web_export import MANIFEST, slugify, write_shards, write_search_index
+from fragment_cache import FragmentCache, fragment_key
+from paper_store import new_record, load_papers, save_papers, migrate_json_file, atomic_write
 
 logging.basicConfig(format='[%(asctime)s %(levelname)s] %(message)s',
                     datefmt='%m/%d/%Y %H:%M:%S',
@@ -29,6 +50,67 @@ logging.basicConfig(format='[%(asctime)s %(levelname)s] %(message)s',
 base_url = "https://arxiv.paperswithcode.com/api/v0/papers/"
 github_url = "https://api.github.com/search/repositories"
 arxiv_url = "http://arxiv.org/"
+arxiv_api_url = arxiv.Client.query_url_format
+
+def new_arxiv_client(page_size=100):
+    """
+    Create an arxiv.Client whose requests go through the request scheduler.
+    
+    The arxiv package sends its requests through its own session; its
+    requests are spaced by the export.arxiv.org token bucket instead of the
+    client's own delay, so all clients share the same request spacing.
+    """
+    client = arxiv.Client(page_size=page_size)
+    client.query_url_format = arxiv_api_url
+    if hasattr(client, '_session'):
+        http_client.schedule_session(client._session)
+        client.delay_seconds = 0
+    return client
+
+# A single arXiv client is shared by all topic searches
+arxiv_client = new_arxiv_client()
+
+# Marks the end of a prefetched result stream
+_END_OF_STREAM = object()
+
+def configure_endpoints(config):
+    """
+    Set the API base URLs from config.yaml: `base_url` (paperswithcode) and
+    the `endpoints` section (arxiv, europepmc, github). The offline
+    benchmarks point them at a local stand-in server.
+    
+    Args:
+        config: Configuration dictionary
+    """
+    global base_url, github_url, arxiv_api_url
+    endpoints = config.get('endpoints') or {}
+    base_url = config.get('base_url') or base_url
+    github_url = endpoints.get('github') or github_url
+    if endpoints.get('arxiv'):
+        arxiv_api_url = endpoints['arxiv'] + '?{}'
+        arxiv_client.query_url_format = arxiv_api_url
+    if endpoints.get('europepmc'):
+        EuropePMCSearch.BASE_URL = endpoints['europepmc']
+
+def parse_filters(filters: list) -> str:
+    '''
+    filters: list of filter terms
+    return: the terms OR'ed together, multi-word phrases quoted
+    '''
+    ESCAPE = '\"'
+    OR = ' OR '
+    ret = ''
+    for idx in range(len(filters)):
+        filter_term = filters[idx]
+        # Escape multi-word phrases with quotes
+        if len(filter_term.split()) > 1:
+            ret += (ESCAPE + filter_term + ESCAPE)
+        else:
+            ret += filter_term
+        # Add OR between filters
+        if idx != len(filters) - 1:
+            ret += OR
+    return ret
 
 def load_config(config_file:str) -> dict:
     '''
@@ -38,22 +120,6 @@ def load_config(config_file:str) -> dict:
     # Format filters for arxiv query with proper escaping
     def pretty_filters(**config) -> dict:
         keywords = dict()
-        ESCAPE = '\"'
-        OR = ' OR '
-        
-        def parse_filters(filters: list) -> str:
-            ret = ''
-            for idx in range(len(filters)):
-                filter_term = filters[idx]
-                # Escape multi-word phrases with quotes
-                if len(filter_term.split()) > 1:
-                    ret += (ESCAPE + filter_term + ESCAPE)
-                else:
-                    ret += filter_term
-                # Add OR between filters
-                if idx != len(filters) - 1:
-                    ret += OR
-            return ret
         for k,v in config['keywords'].items():
             keywords[k] = parse_filters(v['filters'])
         return keywords
@@ -79,23 +145,39 @@ def get_authors(authors, first_author=False):
     return ", ".join(str(author) for author in authors)
 
 
-def sort_papers(papers):
+def search_github(qword: str) -> str:
     """
-    Sort papers dictionary by keys in reverse order.
+    Search GitHub for code repositories related to the query.
+    Network and API errors are raised to the caller.
     
     Args:
-        papers: Dictionary of papers with paper IDs as keys
+        qword: Query string (e.g., arxiv ID or paper title)
     
     Returns:
-        Sorted dictionary
+        GitHub repository URL if found, None otherwise
     """
-    output = dict()
-    keys = list(papers.keys())
-    keys.sort(reverse=True)
-    for key in keys:
-        output[key] = papers[key]
-    return output
+    query = f"{qword}"
+    params = {
+        "q": query,
+        "sort": "stars",
+        "order": "desc"
+    }
+    r = http_client.get(github_url, source='github', params=params)
+    return parse_github_search(r.json())
 
+async def search_github_async(session, qword):
+    """search_github with an http_client.AsyncSession."""
+    params = {"q": qword, "sort": "stars", "order": "desc"}
+    r = await session.get(github_url, source='github', params=params)
+    return parse_github_search(r.json())
+
+def parse_github_search(results):
+    """Most starred repository URL of a GitHub search response, None if there is none."""
+    if "total_count" not in results:
+        raise ValueError(results.get("message", "unexpected GitHub response"))
+    if results["total_count"] > 0:
+        return results["items"][0]["html_url"]
+    return None
 
 def get_code_link(qword: str) -> str:
     """
@@ -107,211 +189,1031 @@ def get_code_link(qword: str) -> str:
     Returns:
         GitHub repository URL if found, None otherwise
     """
-    query = f"{qword}"
-    params = {
-        "q": query,
-        "sort": "stars",
-        "order": "desc"
-    }
     try:
-        r = requests.get(github_url, params=params, timeout=10)
-        results = r.json()
-        if results.get("total_count", 0) > 0:
-            return results["items"][0]["html_url"]
+        return search_github(qword)
     except Exception as e:
         logging.warning(f"GitHub search failed for '{qword}': {e}")
     return None
 
-def get_daily_papers(topic, query="slam", max_results=2):
+def get_pwc_link(paper_id: str) -> str:
     """
-    Fetch daily papers from arXiv and check for code repositories.
+    Fetch the official code repository of an arXiv paper from paperswithcode.com.
+    Network and API errors are raised to the caller.
     
     Args:
-        topic: Topic name/category
-        query: ArXiv search query string
-        max_results: Maximum number of papers to fetch
+        paper_id: ArXiv paper ID (with or without version suffix)
     
     Returns:
-        Tuple of (data, data_web) dictionaries with paper information
+        Repository URL if found, None otherwise
     """
-    content = dict()
-    content_to_web = dict()
+    code_url = base_url + paper_id
+    r = http_client.get(code_url, source='paperswithcode').json()
+    if "official" in r and r["official"]:
+        return r["official"]["url"]
+    return None
+
+async def get_pwc_link_async(session, paper_id):
+    """get_pwc_link with an http_client.AsyncSession."""
+    r = (await session.get(base_url + paper_id, source='paperswithcode')).json()
+    if "official" in r and r["official"]:
+        return r["official"]["url"]
+    return None
+
+def cached_lookup(cache, paper_key, kind, fetch, *args):
+    """
+    Run a code-link lookup through the enrichment cache.
     
-    results_list = []
+    Fresh cached answers (including negative ones) are returned without a
+    request. Failed lookups are logged and not cached, so they are retried
+    on the next run.
     
-    # ArXiv Search
+    Args:
+        cache: EnrichmentCache instance or None
+        paper_key: Paper key used as cache key
+        kind: Lookup kind (e.g. 'paperswithcode', 'github_title')
+        fetch: Function performing the lookup
+        *args: Arguments passed to fetch
+    
+    Returns:
+        Repository URL if found, None otherwise
+    """
+    if cache is not None:
+        found, value = cache.get(paper_key, kind)
+        if found:
+            return value
+    return fetch_and_store(cache, paper_key, kind, fetch, *args)
+
+def fetch_and_store(cache, paper_key, kind, fetch, *args):
+    """
+    Run a code-link lookup and store its answer in the enrichment cache.
+    Failed lookups are logged and not cached.
+    
+    Returns:
+        Repository URL if found, None otherwise
+    """
+    try:
+        value = fetch(*args)
+    except Exception as e:
+        logging.warning(f"{kind} lookup failed for {paper_key}: {e}")
+        return None
+    if cache is not None:
+        cache.set(paper_key, kind, value)
+    return value
+
+async def cached_lookup_async(cache, paper_key, kind, fetch, *args):
+    """cached_lookup for a coroutine function fetch."""
+    if cache is not None:
+        found, value = cache.get(paper_key, kind)
+        if found:
+            return value
+    return await fetch_and_store_async(cache, paper_key, kind, fetch, *args)
+
+async def fetch_and_store_async(cache, paper_key, kind, fetch, *args):
+    """fetch_and_store for a coroutine function fetch."""
+    try:
+        value = await fetch(*args)
+    except Exception as e:
+        logging.warning(f"{kind} lookup failed for {paper_key}: {e}")
+        return None
+    if cache is not None:
+        cache.set(paper_key, kind, value)
+    return value
+
+def find_code_link(paper_id, paper_key, paper_title, is_arxiv=True, cache=None, github=True):
+    """
+    Resolve the code repository of a paper: paperswithcode first (arXiv only),
+    then a GitHub search by title and finally by paper key.
+    
+    Args:
+        github: False skips the GitHub searches (done in batches by
+            add_github_links instead)
+    
+    Returns:
+        Repository URL if found, None otherwise
+    """
+    repo_url = None
+    if is_arxiv:
+        repo_url = cached_lookup(cache, paper_key, 'paperswithcode', get_pwc_link, paper_id)
+    if repo_url is None and github:
+        repo_url = cached_lookup(cache, paper_key, 'github_title', search_github, paper_title)
+    if repo_url is None and github:
+        repo_url = cached_lookup(cache, paper_key, 'github_id', search_github, paper_key)
+    return repo_url
+
+async def find_code_link_async(session, paper_id, paper_key, paper_title, is_arxiv=True,
+                               cache=None, github=True):
+    """find_code_link with the lookups sent through an http_client.AsyncSession."""
+    repo_url = None
+    if is_arxiv:
+        repo_url = await cached_lookup_async(cache, paper_key, 'paperswithcode',
+                                             get_pwc_link_async, session, paper_id)
+    if repo_url is None and github:
+        repo_url = await cached_lookup_async(cache, paper_key, 'github_title',
+                                             search_github_async, session, paper_title)
+    if repo_url is None and github:
+        repo_url = await cached_lookup_async(cache, paper_key, 'github_id',
+                                             search_github_async, session, paper_key)
+    return repo_url
+
+def add_github_links(records, resolver, cache=None):
+    """
+    Fill in missing code links with batched GitHub searches.
+    
+    Like find_code_link, papers are searched by title first and then by
+    paper key; cached answers are used and new answers stored under the
+    same lookup kinds, so batched and single lookups share the cache.
+    
+    Args:
+        records: Dictionary of paper key -> record, updated in place
+        resolver: GitHubResolver
+        cache: Optional EnrichmentCache for code-link lookups
+    """
+    for kind, term in (('github_title', lambda paper_key: records[paper_key]['title']),
+                       ('github_id', lambda paper_key: paper_key)):
+        terms = dict()
+        for paper_key, record in records.items():
+            if record.get('code_url'):
+                continue
+            if cache is not None:
+                found, value = cache.get(paper_key, kind)
+                if found:
+                    record['code_url'] = value
+                    continue
+            terms[paper_key] = term(paper_key)
+        if not terms:
+            continue
+        for paper_key, value in resolver.resolve(terms).items():
+            if cache is not None:
+                cache.set(paper_key, kind, value)
+            records[paper_key]['code_url'] = value
+
+def search_arxiv(query, max_results=2, engine=None):
+    """
+    Stream the arXiv results of a query, newest first.
+    
+    With an AsyncEngine the pages are fetched on its event loop, starting
+    right away; otherwise they are fetched as the stream is read.
+    """
+    if engine is not None:
+        return engine.stream(engine.search_arxiv(arxiv_api_url, query, max_results),
+                             label='ArXiv search')
+    return arxiv_results(query, max_results)
+
+def arxiv_results(query, max_results=2):
+    """
+    Stream the arXiv results of a query with the arxiv package.
+    
+    The arXiv host slot is only held while the next result (and with it the
+    next page) is fetched, not while the caller processes it.
+    """
     try:
         search_engine = arxiv.Search(
             query=query,
             max_results=max_results,
             sort_by=arxiv.SortCriterion.SubmittedDate
         )
-        results_list.extend(list(search_engine.results()))
+        results = arxiv_client.results(search_engine)
+        while True:
+            with host_slot(arxiv_api_url):
+                result = next(results, None)
+            if result is None:
+                return
+            # Keep only the fields used downstream, not the full arxiv.Result
+            yield Paper.from_arxiv(result)
     except Exception as e:
         logging.error(f"ArXiv search failed: {e}")
 
-    # Europe PMC Search
-    try:
+def search_europe_pmc(query, max_results=2, harvester=None, engine=None):
+    """Stream the Europe PMC results of a query, newest first (see search_arxiv)."""
+    if harvester is not None:
+        epmc_search = harvester.search(query)
+    else:
         epmc_search = EuropePMCSearch(query=query, max_results=max_results)
-        results_list.extend(list(epmc_search.results()))
+    if engine is not None:
+        return engine.stream(epmc_search.async_results(engine.session),
+                             label='Europe PMC search')
+    # Failed searches are logged (and marked for the harvester) by results()
+    return epmc_search.results()
+
+def newest_first(*streams, key=attrgetter('published')):
+    """Lazily merge result streams that are each sorted newest first (k-way heap merge)."""
+    return heapq.merge(*streams, key=key, reverse=True)
+
+def prefetch(iterable, executor):
+    """
+    Consume an iterable in an executor thread.
+    
+    Returns an iterator over its items that become available as soon as they
+    are produced, so the fetching of later pages overlaps with processing.
+    """
+    items = queue.Queue()
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception as e:
+            logging.error(f"Search stream failed: {e}")
+        finally:
+            items.put(_END_OF_STREAM)
+
+    executor.submit(produce)
+    return iter(items.get, _END_OF_STREAM)
+
+def search_papers(query, max_results=2, harvester=None, since=None, engine=None,
+                  journal=None):
+    """
+    Search arXiv and Europe PMC for a query.
+    
+    Both sources return newest first; their streams are merged lazily, so
+    the first results can be processed while later pages are still fetched.
+    
+    Args:
+        query: Search query string
+        max_results: Maximum number of papers to fetch from each source
+        harvester: Optional EuropePMCHarvester; Europe PMC is then searched
+            incrementally over the query's date window instead
+        since: Optional datetime; the search stops at the first result
+            published before it (incremental runs)
+        engine: Optional AsyncEngine fetching the pages
+        journal: Optional RunJournal; the results are journaled once the
+            stream is complete, and a search the interrupted run completed
+            is replayed from the journal instead of being sent again
+    
+    Returns:
+        Iterator of Paper objects, newest first
+    """
+    if journal is not None and query in journal.searches:
+        logging.info(f"Search '{query[:40]}' replayed from the run journal")
+        return iter(journal.searches[query])
+    results = newest_first(search_arxiv(query, max_results, engine),
+                           search_europe_pmc(query, max_results, harvester, engine))
+    if since is not None:
+        results = published_since(results, since, query)
+    if journal is not None:
+        results = journaled_search(results, query, journal)
+    return results
+
+def journaled_search(results, query, journal):
+    """Results of a search stream, journaled once the stream is exhausted."""
+    papers = []
+    for result in results:
+        papers.append(result)
+        yield result
+    journal.search(query, papers)
+
+def published_since(results, since, query=''):
+    """Results up to the first one published before since."""
+    for result in results:
+        if result.published < since:
+            logging.info(f"Search '{query[:40]}' stopped at papers published before {since.date()}")
+            return
+        yield result
+
+def get_paper_key(result):
+    """
+    Return the key a search result is stored under.
+    
+    ArXiv papers use their ID without version suffix (e.g. 2108.09112v1 ->
+    2108.09112), Europe PMC papers their source ID (PMID, PPR ID).
+    """
+    paper_id = result.get_short_id()
+    if result.source != 'arxiv':
+        return paper_id
+    ver_pos = paper_id.find('v')
+    return paper_id[0:ver_pos] if ver_pos != -1 else paper_id
+
+def get_update_date(result):
+    """Return the last updated date of a search result (published date as fallback)."""
+    return result.updated.date()
+
+def get_source(result):
+    """Return the source name stored with a search result ('arxiv', 'MED', 'PPR')."""
+    return result.source
+
+def get_paper_url(result):
+    """Return the URL stored with a search result."""
+    if result.source != 'arxiv':
+        return result.entry_id
+    return arxiv_url + 'abs/' + get_paper_key(result)
+
+def is_known_paper(known, paper_key, result):
+    """Check whether a stored paper is up to date, i.e. can skip enrichment."""
+    return bool(known) and paper_key in known and str(get_update_date(result)) <= known[paper_key]
+
+def format_paper(result, cache=None, github=True):
+    """
+    Look up the code link of a search result and build its paper record.
+    
+    Args:
+        result: Paper (see paper_model)
+        cache: Optional EnrichmentCache for code-link lookups
+        github: False leaves the GitHub searches to add_github_links
+    
+    Returns:
+        Tuple of (paper_key, record)
+    """
+    paper_key = get_paper_key(result)
+    try:
+        # Try paperswithcode.com (arXiv papers only), then fall back to GitHub search
+        repo_url = find_code_link(result.get_short_id(), paper_key, result.title,
+                                  is_arxiv=result.source == 'arxiv',
+                                  cache=cache, github=github)
     except Exception as e:
-        logging.error(f"Europe PMC search failed: {e}")
-
-    # Sort combined results by date
-    results_list.sort(key=lambda x: x.published, reverse=True)
-
-    for result in results_list:
-        paper_id = result.get_short_id()
-        paper_title = result.title
-        paper_url = result.entry_id
-        paper_abstract = result.summary.replace("\n", " ")
-        paper_authors = get_authors(result.authors)
-        paper_first_author = get_authors(result.authors, first_author=True)
-        
-        # Handle primary_category safely
-        if hasattr(result, 'primary_category'):
-            primary_category = result.primary_category
+        logging.error(f"Exception processing paper {paper_key}: {e}")
+        # Save the paper entry even if there was an error
+        repo_url = None
+    return paper_key, build_record(result, repo_url)
+
+async def format_paper_async(engine, result, cache=None, github=True):
+    """format_paper with the lookups run on an AsyncEngine."""
+    paper_key = get_paper_key(result)
+    try:
+        repo_url = await find_code_link_async(engine.session, result.get_short_id(), paper_key,
+                                              result.title, is_arxiv=result.source == 'arxiv',
+                                              cache=cache, github=github)
+    except Exception as e:
+        logging.error(f"Exception processing paper {paper_key}: {e}")
+        repo_url = None
+    return paper_key, build_record(result, repo_url)
+
+def build_record(result, repo_url):
+    """Build the paper record of a search result with its code link."""
+    paper_title = result.title
+    paper_first_author = get_authors(result.authors, first_author=True)
+    update_time = get_update_date(result)
+
+    logging.info(f"Time = {update_time} title = {paper_title} author = {paper_first_author}")
+
+    return new_record(get_paper_key(result), update_time, paper_title, paper_first_author,
+                      get_paper_url(result), code_url=repo_url, source=get_source(result),
+                      comment=result.comment or None,
+                      abstract=' '.join((result.summary or '').split()) or None)
+
+def get_daily_papers(topic, query="slam", max_results=2, cache=None, known=None, github=None,
+                     engine=None):
+    """
+    Fetch daily papers from arXiv and check for code repositories.
+    
+    Args:
+        topic: Topic name/category
+        query: ArXiv search query string
+        max_results: Maximum number of papers to fetch
+        cache: Optional EnrichmentCache for code-link lookups
+        known: Optional dict of paper key -> stored date for papers already
+            in the JSON store; these are skipped unless their date is newer
+        github: Optional GitHubResolver; GitHub searches are then batched
+        engine: Optional AsyncEngine; the papers are then enriched concurrently
+    
+    Returns:
+        Dictionary {topic: {paper key: record}}
+    """
+    content = dict()
+
+    for result in search_papers(query, max_results, engine=engine):
+        # Incremental run: stored papers are only reprocessed when updated
+        if is_known_paper(known, get_paper_key(result), result):
+            logging.info(f"Skip known paper {get_paper_key(result)}")
+            continue
+        if engine is not None:
+            content[get_paper_key(result)] = engine.submit(
+                format_paper_async(engine, result, cache, github=github is None))
+        else:
+            paper_key, content[paper_key] = format_paper(result, cache, github=github is None)
+    if engine is not None:
+        content = dict(future.result() for future in content.values())
+
+    if github is not None:
+        add_github_links(content, github, cache)
+    return {topic: content}
+
+def build_union_queries(topic_keywords, terms_per_query=40):
+    """
+    Merge the filters of all topics into a few broad OR queries.
+    
+    Args:
+        topic_keywords: The `keywords` section of config.yaml
+        terms_per_query: Maximum number of filter terms per query
+    
+    Returns:
+        List of query strings
+    """
+    terms = []
+    seen = set()
+    for v in topic_keywords.values():
+        for term in v['filters']:
+            if term.lower() not in seen:
+                seen.add(term.lower())
+                terms.append(term)
+    step = max(1, terms_per_query)
+    return [parse_filters(terms[i:i + step]) for i in range(0, len(terms), step)]
+
+def search_topics(keywords, max_results=2, executor=None, harvester=None, since=None,
+                  engine=None, journal=None):
+    """
+    Run one search per topic.
+    
+    Args:
+        keywords: Dictionary of topic -> search query
+        max_results: Maximum number of papers per topic and source
+        executor: Optional executor the searches are streamed from in parallel
+        harvester: Optional EuropePMCHarvester for incremental Europe PMC searches
+        since: Optional dict of topic -> datetime at which its search stops
+        engine: Optional AsyncEngine; the searches then run concurrently on
+            its event loop and no executor is needed
+        journal: Optional RunJournal of the completed searches
+    
+    Returns:
+        Iterator of (topic, result) pairs, newest first
+    """
+    streams = []
+    for topic, query in keywords.items():
+        stream = run_report.timed(topic, search_papers(query, max_results, harvester,
+                                                       (since or {}).get(topic), engine,
+                                                       journal))
+        if executor is not None and engine is None:
+            stream = prefetch(stream, executor)
+        streams.append(zip(itertools.repeat(topic), stream))
+    return newest_first(*streams, key=lambda item: item[1].published)
+
+def search_combined(topic_keywords, max_results=2, terms_per_query=40,
+                    query_max_results=300, executor=None, harvester=None, since=None,
+                    engine=None, journal=None):
+    """
+    Search with a few union queries and assign the results to topics locally.
+    
+    Every result is matched against all topic filters (title and abstract).
+    Each topic keeps at most max_results papers per source, newest first,
+    like a per-topic search would return.
+    
+    Args:
+        topic_keywords: The `keywords` section of config.yaml
+        max_results: Maximum number of papers per topic and source
+        terms_per_query: Maximum number of filter terms per union query
+        query_max_results: Maximum number of results per union query and source
+        executor: Optional executor the union queries are streamed from in parallel
+        harvester: Optional EuropePMCHarvester for incremental Europe PMC searches
+        since: Optional datetime at which every union query stops
+        engine: Optional AsyncEngine running the union queries
+        journal: Optional RunJournal of the completed union queries
+    
+    Returns:
+        Iterator of (topic, result) pairs, newest first
+    """
+    queries = build_union_queries(topic_keywords, terms_per_query)
+    logging.info(f"Combined search: {len(queries)} union queries for {len(topic_keywords)} topics")
+    streams = [run_report.timed(f"Union query {i + 1}",
+                                search_papers(query, query_max_results, harvester, since, engine,
+                                              journal))
+               for i, query in enumerate(queries)]
+    if executor is not None and engine is None:
+        streams = [prefetch(stream, executor) for stream in streams]
+
+    matcher = TopicMatcher(topic_keywords)
+    seen = set()
+    counts = {}
+    unmatched = 0
+    for result in newest_first(*streams):
+        key = (result.source, get_paper_key(result))
+        if key in seen:
+            continue
+        seen.add(key)
+        topics = matcher.match(result.title, result.summary)
+        if not topics:
+            unmatched += 1
+        for topic in topics:
+            # max_results per topic applies to arXiv and Europe PMC separately
+            count_key = (topic, result.source == 'arxiv')
+            if counts.get(count_key, 0) < max_results:
+                counts[count_key] = counts.get(count_key, 0) + 1
+                yield topic, result
+    if unmatched:
+        logging.info(f"Combined search: {unmatched} results matched no topic filter")
+
+def get_all_daily_papers(keywords, max_results=2, cache=None, known=None, max_workers=1,
+                         combined=None, filters=None, harvester=None,
+                         archive=None, dedup=None, since=None, github=None, engine=None,
+                         journal=None):
+    """
+    Fetch papers for all topics, enriching each unique paper only once.
+    
+    The searches are streamed in parallel and merged newest first. Results
+    are deduplicated across topics and sources as they arrive (see
+    dedup.Deduplicator): the same paper key, the same DOI, or a
+    near-identical title with the same first author. Papers not stored yet
+    are enriched while the searches go on; every unique paper is enriched
+    once, and the rendered entries are fanned out to each topic that
+    matched it. An arXiv preprint and its PubMed record become one entry
+    that keeps the other version's URL as `alt_url`.
+    
+    Args:
+        keywords: Dictionary of topic -> search query
+        max_results: Maximum number of papers to fetch per topic and source
+        cache: Optional EnrichmentCache for code-link lookups
+        known: Optional dict of topic -> {paper key: stored date}
+        max_workers: Number of searches / enrichments run in parallel
+        combined: Optional `combined_query` config section; when enabled,
+            the topic filters are searched with union queries and papers
+            classified locally instead of one search per topic
+        filters: The `keywords` section of config.yaml (needed by combined)
+        harvester: Optional EuropePMCHarvester for incremental Europe PMC searches
+        archive: Optional stored papers (topic -> {paper key: record}); new
+            results duplicating a stored paper are not enriched again
+        dedup: Optional `dedup` config section (thresholds, enabled)
+        since: Optional dict of topic -> datetime; searches stop at older
+            results (see stop_dates)
+        github: Optional GitHubResolver; the GitHub searches of all papers
+            without a paperswithcode link are then batched
+        engine: Optional AsyncEngine; searches and enrichment lookups then
+            run on its event loop instead of the worker pools
+        journal: Optional RunJournal; completed searches and enriched
+            records are journaled, and those of an interrupted run are
+            reused (records only if they have a code link)
+    
+    Returns:
+        List with one {topic: {paper key: record}} dictionary per topic, in
+        config order
+    """
+    known = known or {}
+    dedup = dedup or {}
+    since = since or {}
+
+    # Without title matching only papers sharing a DOI are merged
+    deduplicator = Deduplicator(
+        title_threshold=dedup.get('title_threshold', 0.8) if dedup.get('enabled', True) else None,
+        block_threshold=dedup.get('block_threshold', 0.5))
+    stored = dict()
+    for papers in (archive or {}).values():
+        for paper_key, record in papers.items():
+            if paper_key not in stored:
+                stored[paper_key] = record
+                deduplicator.add_record(paper_key, record)
+
+    workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=workers) as search_executor, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        if combined and combined.get('enabled'):
+            # Union queries serve all topics: stop at the oldest topic's date
+            stop = None
+            if all(since.get(topic) is not None for topic in keywords):
+                stop = min(since[topic] for topic in keywords)
+            stream = search_combined(filters, max_results,
+                                     terms_per_query=combined.get('terms_per_query', 40),
+                                     query_max_results=combined.get('max_results', 300),
+                                     executor=search_executor, harvester=harvester, since=stop,
+                                     engine=engine, journal=journal)
         else:
-            primary_category = None
-            
-        publish_time = result.published.date()
-        # Handle updated time safely
-        if hasattr(result, 'updated') and result.updated:
-            update_time = result.updated.date()
+            stream = search_topics(keywords, max_results, executor=search_executor,
+                                   harvester=harvester, since=since, engine=engine,
+                                   journal=journal)
+
+        clusters = dict()     # cluster -> {paper key: search result}
+        topic_ids = {topic: [] for topic in keywords}
+        pending = dict()      # paper key -> format_paper future
+        if engine is not None:
+            def submit(result):
+                return engine.submit(format_paper_async(engine, result, cache=cache,
+                                                        github=github is None))
         else:
-            update_time = publish_time
-            
-        comments = result.comment
+            submit = functools.partial(executor.submit, format_paper,
+                                       cache=cache, github=github is None)
+
+        def enrich(result):
+            if journal is None:
+                return submit(result)
+            record = journal.records.get(get_paper_key(result))
+            if record is not None and record.get('code_url'):
+                future = Future()
+                future.set_result((get_paper_key(result), record))
+                return future
+            future = submit(result)
+            future.add_done_callback(lambda done: journal.record(*done.result()))
+            return future
+        with run_report.stage('search'):
+            for topic, result in stream:
+                paper_key = get_paper_key(result)
+                cluster = deduplicator.add(paper_key, get_source(result), result.title,
+                                           result.authors[0] if result.authors else '',
+                                           year=result.published.year, doi=result.doi)
+                clusters.setdefault(cluster, {}).setdefault(paper_key, result)
+                ids = topic_ids.setdefault(topic, [])
+                if cluster not in ids:
+                    ids.append(cluster)
+                # A paper that is not stored yet is enriched right away; if a later
+                # arXiv version takes its place, its cached lookup is simply unused
+                if cluster == paper_key and paper_key not in stored and paper_key not in pending:
+                    pending[paper_key] = enrich(result)
+        topic_clusters = list(topic_ids.items())
+
+        # One entry per cluster: the stored paper if there is one, else the
+        # arXiv version; another source's version is kept as alt_url
+        entries = dict()      # cluster -> (paper key, search result or None, alt_url)
+        for cluster, members in clusters.items():
+            if cluster in stored:
+                paper_key = cluster
+            else:
+                paper_key = next((k for k, r in members.items() if get_source(r) == 'arxiv'),
+                                 next(iter(members)))
+            result = members.get(paper_key)
+            source = get_source(result) if result is not None else stored[paper_key]['source']
+            alt_url = next((get_paper_url(r) for k, r in members.items()
+                            if k != paper_key and get_source(r) != source),
+                           stored.get(paper_key, {}).get('alt_url'))
+            entries[cluster] = (paper_key, result, alt_url)
+        if deduplicator.merged:
+            logging.info(f"Merged {deduplicator.merged} duplicate papers across sources")
 
-        logging.info(f"Time = {update_time} title = {paper_title} author = {paper_first_author}")
+        unique = dict()       # paper key -> search result to enrich
+        linked = dict()       # paper key -> stored record with a new alt_url
+        topic_keys = []
+        for topic, ids in topic_clusters:
+            keys = []
+            for cluster in ids:
+                paper_key, result, alt_url = entries[cluster]
+                new_link = alt_url != stored.get(paper_key, {}).get('alt_url')
+                if result is None:
+                    # Only another version of a stored paper was found
+                    if not new_link:
+                        continue
+                    linked[paper_key] = {**stored[paper_key], 'alt_url': alt_url}
+                elif is_known_paper(known.get(topic), paper_key, result) and not new_link:
+                    logging.info(f"Skip known paper {paper_key} in {topic}")
+                    continue
+                else:
+                    unique.setdefault(paper_key, result)
+                if paper_key not in keys:
+                    keys.append(paper_key)
+            topic_keys.append((topic, keys))
+
+        total = sum(len(keys) for _, keys in topic_keys)
+        early = sum(1 for paper_key in unique if paper_key in pending)
+        logging.info(f"Enriching {len(unique)} unique papers for {total} topic entries "
+                     f"({early} started during the search)")
+        run_report.current().count('papers_enriched', len(unique))
+        run_report.current().count('duplicates_merged', deduplicator.merged)
+        with run_report.stage('enrichment'):
+            for paper_key, result in unique.items():
+                if paper_key not in pending:
+                    pending[paper_key] = enrich(result)
+            formatted = {paper_key: pending[paper_key].result()[1] for paper_key in unique}
+        if github is not None:
+            with run_report.stage('github_search'):
+                add_github_links(formatted, github, cache)
+
+    alt_urls = {paper_key: alt_url for paper_key, _, alt_url in entries.values()}
+    for paper_key, record in formatted.items():
+        record['alt_url'] = alt_urls.get(paper_key)
+    formatted.update(linked)
+    return [{topic: {k: formatted[k] for k in keys}} for topic, keys in topic_keys]
+
+def stop_dates(archive, topics, lookback_days=3):
+    """
+    Dates at which the searches of an incremental run stop, per topic.
+    
+    Both sources return newest first, so results published before the
+    newest stored paper of a topic (minus lookback_days for late indexing)
+    were already seen by an earlier run. Topics without stored papers are
+    searched in full.
+    
+    Args:
+        archive: Stored papers, topic -> {paper key: record}
+        topics: Topic names
+        lookback_days: Overlap with the previous run in days
+    
+    Returns:
+        Dictionary of topic -> datetime
+    """
+    since = dict()
+    for topic in topics:
+        dates = [record['date'] for record in (archive.get(topic) or {}).values()
+                 if record.get('date')]
+        if dates:
+            since[topic] = (datetime.datetime.fromisoformat(max(dates))
+                            - datetime.timedelta(days=lookback_days))
+    return since
 
-        # Handle ID and URL based on source
-        if isinstance(result, EuropePMCPaper):
-            paper_key = paper_id
-            paper_url = result.entry_id
+def load_known_papers(filenames):
+    """
+    Collect the papers already stored in the JSON files, per topic.
+    
+    A paper only counts as known for a topic if every given file holds it,
+    so skipping it cannot leave one of the outputs without the entry.
+    
+    Args:
+        filenames: JSON file paths that will be updated by this run
+    
+    Returns:
+        Dictionary of topic -> {paper key: stored date string}
+    """
+    known = None
+    for filename in filenames:
+        data = load_papers(filename)
+        dates = {topic: {k: record['date'] for k, record in papers.items()}
+                 for topic, papers in data.items()}
+        if known is None:
+            known = dates
         else:
-            # ArXiv logic
-            # Remove version suffix from paper ID (e.g., 2108.09112v1 -> 2108.09112)
-            ver_pos = paper_id.find('v')
-            paper_key = paper_id[0:ver_pos] if ver_pos != -1 else paper_id
-            paper_url = arxiv_url + 'abs/' + paper_key
+            known = {topic: {k: v for k, v in papers.items() if k in dates.get(topic, {})}
+                     for topic, papers in known.items()}
+    return known or {}
+
+def load_archive(filenames):
+    """
+    Merge the papers stored in the JSON files.
+    
+    Returns:
+        Dictionary of topic -> {paper key: record}
+    """
+    archive = dict()
+    for filename in filenames:
+        for topic, papers in load_papers(filename).items():
+            archive.setdefault(topic, {}).update(papers)
+    return archive
+
+def open_harvester(config):
+    """
+    Create the EuropePMCHarvester described by the `europepmc_harvest` config section.
+    
+    Returns:
+        EuropePMCHarvester instance, or None if harvesting is disabled
+    """
+    options = config.get('europepmc_harvest') or {}
+    if not options.get('enabled'):
+        return None
+    harvester = EuropePMCHarvester(options['state_path'],
+                                   backfill_from=options.get('backfill_from', '2015-01-01'),
+                                   lookback_days=options.get('lookback_days', 3),
+                                   max_results=options.get('max_results', 5000),
+                                   backfill=config.get('backfill', False))
+    logging.info(f"Europe PMC harvest: state for {len(harvester.state)} queries")
+    return harvester
 
+def refresh_code_links(paper_ids, cache=None, max_workers=1,
+                       time_budget=None, request_budget=None, engine=None, journal=None):
+    """
+    Look up paperswithcode links for many papers in a bounded worker pool.
+    
+    Papers are checked in the given order. Fresh cached answers are used
+    without a request; the remaining lookups stop being scheduled once the
+    request budget is used up or the time budget has passed.
+    
+    Args:
+        paper_ids: ArXiv keys to check, highest priority first
+        cache: Optional EnrichmentCache for code-link lookups
+        max_workers: Number of lookups run in parallel
+        time_budget: Optional wall-clock budget in seconds
+        request_budget: Optional maximum number of lookups sent
+        engine: Optional AsyncEngine; all lookups are then scheduled on its
+            event loop at once, paced only by the host limits
+        journal: Optional RunJournal; found links are journaled, and links
+            found by an interrupted run are not looked up again
+    
+    Returns:
+        Dictionary of paper key -> repository URL for the links found
+    """
+    found = dict()
+    pending = []
+    for paper_id in paper_ids:
+        if journal is not None and paper_id in journal.links:
+            found[paper_id] = journal.links[paper_id]
+            continue
+        if cache is not None:
+            hit, value = cache.get(paper_id, 'paperswithcode')
+            if hit:
+                if value is not None:
+                    found[paper_id] = value
+                continue
+        pending.append(paper_id)
+
+    if request_budget is not None and len(pending) > request_budget:
+        logging.info(f"Request budget: checking {request_budget} of {len(pending)} papers")
+        pending = pending[:request_budget]
+    logging.info(f"Refreshing code links: {len(pending)} lookups, "
+                 f"{len(paper_ids) - len(pending)} answered by cache or skipped")
+
+    executor = None
+    if engine is not None:
+        futures = {engine.submit(fetch_and_store_async(cache, paper_id, 'paperswithcode',
+                                                       get_pwc_link_async, engine.session,
+                                                       paper_id)): paper_id
+                   for paper_id in pending}
+    else:
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        futures = {executor.submit(fetch_and_store, cache, paper_id, 'paperswithcode',
+                                   get_pwc_link, paper_id): paper_id
+                   for paper_id in pending}
+    try:
+        done = 0
         try:
-            # Try to fetch source code link from paperswithcode.com
-            repo_url = None
-            # Only check paperswithcode for arXiv papers or if we have a compatible ID
-            if not isinstance(result, EuropePMCPaper):
-                code_url = base_url + paper_id
-                try:
-                    r = requests.get(code_url, timeout=10).json()
-                    if "official" in r and r["official"]:
-                        repo_url = r["official"]["url"]
-                except Exception as e:
-                    logging.warning(f"Could not fetch code link from paperswithcode.com for {paper_key}: {e}")
-            
-            # Fallback: Search GitHub if no code found on paperswithcode
-            if repo_url is None:
-                repo_url = get_code_link(paper_title)
-                if repo_url is None:
-                    repo_url = get_code_link(paper_key)
-            
-            # Format paper entry for README (table format)
-            if repo_url is not None:
-                content[paper_key] = "|**{}**|**{}**|{} et.al.|[{}]({})|**[link]({})**|\n".format(
-                    update_time, paper_title, paper_first_author, paper_key, paper_url, repo_url)
-                content_to_web[paper_key] = "- {}, **{}**, {} et.al., Paper: [{}]({}), Code: **[{}]({})**".format(
-                    update_time, paper_title, paper_first_author, paper_url, paper_url, repo_url, repo_url)
-            else:
-                # No code link found - leave Code column empty
-                content[paper_key] = "|**{}**|**{}**|{} et.al.|[{}]({})||\n".format(
-                    update_time, paper_title, paper_first_author, paper_key, paper_url)
-                content_to_web[paper_key] = "- {}, **{}**, {} et.al., Paper: [{}]({})".format(
-                    update_time, paper_title, paper_first_author, paper_url, paper_url)
-
-            # Add comments if available
-            if comments:
-                content_to_web[paper_key] += f", {comments}\n"
-            else:
-                content_to_web[paper_key] += "\n"
+            for future in as_completed(futures, timeout=time_budget):
+                done += 1
+                repo_url = future.result()
+                if repo_url is not None:
+                    found[futures[future]] = repo_url
+                    if journal is not None:
+                        journal.link(futures[future], repo_url)
+        except FuturesTimeout:
+            cancelled = sum(1 for future in futures if future.cancel())
+            logging.warning(f"Time budget of {time_budget}s used up after {done} lookups, "
+                            f"{cancelled} lookups left for the next run")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return found
+
+def fetch_arxiv_metadata(paper_ids, batch_size=200, max_requests=None, engine=None):
+    """
+    Fetch the current arXiv metadata of many papers with id_list searches.
+    
+    Each request asks for a whole batch of IDs; the requests are spaced like
+    all other arXiv requests.
+    
+    Args:
+        paper_ids: ArXiv keys (without version), highest priority first
+        batch_size: IDs per request
+        max_requests: Optional maximum number of requests sent
+        engine: Optional AsyncEngine sending the requests
+    
+    Returns:
+        Dictionary of paper key -> Paper (latest version) for the papers found
+    """
+    batches = [paper_ids[i:i + batch_size] for i in range(0, len(paper_ids), batch_size)]
+    if max_requests is not None and len(batches) > max_requests:
+        logging.info(f"Request budget: refreshing metadata of {max_requests * batch_size} "
+                     f"of {len(paper_ids)} papers")
+        batches = batches[:max_requests]
+    logging.info(f"Refreshing arXiv metadata: {len(paper_ids)} papers, {len(batches)} requests")
 
+    # The page size is the batch size, so every batch is a single request
+    client = new_arxiv_client(page_size=batch_size)
+
+    found = dict()
+    for batch in batches:
+        requested = set(batch)
+        try:
+            if engine is not None:
+                results = list(engine.stream(engine.search_arxiv(
+                    arxiv_api_url, id_list=batch, max_results=len(batch), page_size=batch_size)))
+            else:
+                search_engine = arxiv.Search(id_list=batch, max_results=len(batch))
+                with host_slot(arxiv_api_url):
+                    results = [Paper.from_arxiv(result) for result in client.results(search_engine)]
         except Exception as e:
-            logging.error(f"Exception processing paper {paper_key}: {e}")
-            # Save the paper entry even if there was an error
-            content[paper_key] = "|**{}**|**{}**|{} et.al.|[{}]({})||\n".format(
-                update_time, paper_title, paper_first_author, paper_key, paper_url)
-            content_to_web[paper_key] = "- {}, **{}**, {} et.al., Paper: [{}]({})\n".format(
-                update_time, paper_title, paper_first_author, paper_url, paper_url)
+            logging.warning(f"ArXiv metadata request for {len(batch)} papers failed: {e}")
+            continue
+        for paper in results:
+            paper_key = get_paper_key(paper)
+            # Unknown or withdrawn IDs come back as error entries
+            if paper_key in requested:
+                found[paper_key] = paper
+    return found
 
-    data = {topic: content}
-    data_web = {topic: content_to_web}
-    return data, data_web
+def update_arxiv_metadata(record, paper):
+    """
+    Copy the current arXiv metadata of a paper into its stored record.
+    
+    The date only moves forward (a new version); title, comment and
+    abstract are replaced when arXiv has a value for them.
+    
+    Args:
+        record: Stored paper record
+        paper: Paper fetched from arXiv
+    
+    Returns:
+        True if the record changed
+    """
+    values = {'title': paper.title,
+              'comment': paper.comment or None,
+              'abstract': ' '.join((paper.summary or '').split()) or None}
+    update_time = str(get_update_date(paper))
+    if update_time > record['date']:
+        values['date'] = update_time
+    changed = False
+    for field, value in values.items():
+        if value and record.get(field) != value:
+            record[field] = value
+            changed = True
+    return changed
 
-def update_paper_links(filename):
+def refresh_arxiv_metadata(records, batch_size=200, max_requests=None, engine=None):
+    """
+    Bring stored arXiv records up to date (dates of new versions, titles,
+    comments, missing abstracts), most recent papers first.
+    
+    Args:
+        records: Dictionary of paper key -> list of its records (a paper may
+            be listed under several topics); updated in place
+        batch_size: IDs per arXiv request
+        max_requests: Optional maximum number of requests sent
+        engine: Optional AsyncEngine sending the requests
+    
+    Returns:
+        List of the keys of the updated papers
+    """
+    order = sorted(records, key=lambda k: records[k][0]['date'], reverse=True)
+    papers = fetch_arxiv_metadata(order, batch_size=batch_size, max_requests=max_requests,
+                                  engine=engine)
+    updated = []
+    for paper_key, paper in papers.items():
+        changed = [update_arxiv_metadata(record, paper) for record in records[paper_key]]
+        if any(changed):
+            logging.info(f"ID = {paper_key}, metadata updated to {paper.get_short_id()}")
+            updated.append(paper_key)
+    logging.info(f"ArXiv metadata: {len(papers)} of {len(order)} papers fetched, "
+                 f"{len(updated)} updated")
+    run_report.current().count('metadata_updated', len(updated))
+    return updated
+
+def update_paper_links(filename, cache=None, max_workers=1,
+                       time_budget=None, request_budget=None,
+                       metadata_batch_size=None, metadata_requests=None, engine=None,
+                       journal=None):
     """
     Weekly update paper links in JSON file by re-checking for code repositories.
     
     Args:
         filename: Path to JSON file containing paper data
+        cache: Optional EnrichmentCache for code-link lookups
+        max_workers: Number of lookups run in parallel
+        time_budget: Optional wall-clock budget in seconds
+        request_budget: Optional maximum number of lookups sent
+        metadata_batch_size: If set, the arXiv metadata of the stored papers
+            is refreshed first, with this many IDs per request
+        metadata_requests: Optional maximum number of metadata requests
+        engine: Optional AsyncEngine sending the requests
+        journal: Optional RunJournal of the found links (see refresh_code_links)
     """
-    def parse_arxiv_string(s):
-        """Parse paper entry string to extract components."""
-        parts = s.split("|")
-        date = parts[1].strip()
-        title = parts[2].strip()
-        authors = parts[3].strip()
-        arxiv_id = parts[4].strip()
-        code = parts[5].strip()
-        # Remove version suffix
-        arxiv_id = re.sub(r'v\d+', '', arxiv_id)
-        return date, title, authors, arxiv_id, code
-
-    with open(filename, "r", encoding='utf-8') as f:
-        content = f.read()
-        if not content:
-            m = {}
-        else:
-            m = json.loads(content)
-
-    json_data = m.copy()
+    json_data = load_papers(filename)
     
     # If no data exists, nothing to update
     if not json_data:
         logging.info(f"No existing data in {filename}, skipping link update")
         return
 
+    # Collect the arXiv papers (a paper may be listed under several topics)
+    stored = dict()
     for keywords, v in json_data.items():
-        logging.info(f'keywords = {keywords}')
-        for paper_id, contents in v.items():
-            contents = str(contents)
-
-            update_time, paper_title, paper_first_author, paper_url, code_url = parse_arxiv_string(contents)
+        for paper_id, record in v.items():
+            if record['source'] == 'arxiv':
+                stored.setdefault(paper_id, []).append(record)
+    if metadata_batch_size:
+        refresh_arxiv_metadata(stored, batch_size=metadata_batch_size,
+                               max_requests=metadata_requests, engine=engine)
 
-            contents = "|{}|{}|{}|{}|{}|\n".format(update_time, paper_title, paper_first_author, paper_url, code_url)
-            json_data[keywords][paper_id] = str(contents)
-            logging.info(f'paper_id = {paper_id}, contents = {contents}')
+    # Check the most recent papers without a code link first
+    missing = {paper_id: records for paper_id, records in stored.items()
+               if not records[0]['code_url']}
+    order = sorted(missing, key=lambda k: missing[k][0]['date'], reverse=True)
+    logging.info(f"{filename}: {len(order)} papers without code link")
 
-            # Check if code link is missing (empty or 'null')
-            valid_link = False if (not code_url or code_url == 'null') else True
-            if valid_link:
-                continue
-                
-            # Try to fetch code link from paperswithcode.com
-            try:
-                code_api_url = base_url + paper_id
-                r = requests.get(code_api_url, timeout=10).json()
-                repo_url = None
-                if "official" in r and r["official"]:
-                    repo_url = r["official"]["url"]
-                    if repo_url is not None:
-                        new_cont = contents.replace('||', f'|**[link]({repo_url})**|').replace('|null|', f'|**[link]({repo_url})**|')
-                        logging.info(f'ID = {paper_id}, updated with code link: {repo_url}')
-                        json_data[keywords][paper_id] = str(new_cont)
-            except Exception as e:
-                logging.error(f"Exception updating paper {paper_id}: {e}")
+    found = refresh_code_links(order, cache=cache, max_workers=max_workers,
+                               time_budget=time_budget, request_budget=request_budget,
+                               engine=engine, journal=journal)
+    for paper_id, repo_url in found.items():
+        logging.info(f'ID = {paper_id}, updated with code link: {repo_url}')
+        for record in missing[paper_id]:
+            record['code_url'] = repo_url
                 
     # Save updated data to JSON file
-    with open(filename, "w", encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
+    save_papers(filename, json_data)
+
+def update_db_paper_links(db, cache=None, max_workers=1,
+                          time_budget=None, request_budget=None,
+                          metadata_batch_size=None, metadata_requests=None, engine=None,
+                          journal=None):
+    """
+    Re-check code links of the arXiv papers in the paper database that have none.
+    
+    Same as update_paper_links, but the papers to check come from an
+    indexed query instead of a full JSON load.
+    
+    Args:
+        db: PaperDB instance
+        cache: Optional EnrichmentCache for code-link lookups
+        max_workers: Number of lookups run in parallel
+        time_budget: Optional wall-clock budget in seconds
+        request_budget: Optional maximum number of lookups sent
+        metadata_batch_size: If set, the arXiv metadata of the stored papers
+            is refreshed first, with this many IDs per request
+        metadata_requests: Optional maximum number of metadata requests
+        engine: Optional AsyncEngine sending the requests
+        journal: Optional RunJournal of the found links (see refresh_code_links)
+    """
+    if metadata_batch_size:
+        stored = {paper_id: [record] for paper_id, record in db.source_papers('arxiv').items()}
+        updated = refresh_arxiv_metadata(stored, batch_size=metadata_batch_size,
+                                         max_requests=metadata_requests, engine=engine)
+        db.set_metadata([stored[paper_id][0] for paper_id in updated])
+
+    order = db.missing_code_links(source='arxiv')
+    logging.info(f"{db.path}: {len(order)} papers without code link")
+
+    found = refresh_code_links(order, cache=cache, max_workers=max_workers,
+                               time_budget=time_budget, request_budget=request_budget,
+                               engine=engine, journal=journal)
+    for paper_id, repo_url in found.items():
+        logging.info(f'ID = {paper_id}, updated with code link: {repo_url}')
+    db.set_code_links(found)
 
 def update_json_file(filename, data_dict):
     """
@@ -319,22 +1221,9 @@ def update_json_file(filename, data_dict):
     
     Args:
         filename: Path to JSON file
-        data_dict: List of dictionaries containing paper data by keyword
-    """
-    # Handle case when file doesn't exist
-    if os.path.exists(filename):
-        with open(filename, "r", encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                m = {}
-            else:
-                m = json.loads(content)
-    else:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        m = {}
-
-    json_data = m.copy()
+        data_dict: List of dictionaries containing paper records by keyword
+    """
+    json_data = load_papers(filename)
 
     # Update papers in each keyword category
     for data in data_dict:
@@ -346,8 +1235,132 @@ def update_json_file(filename, data_dict):
             else:
                 json_data[keyword] = papers
 
-    with open(filename, "w", encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
+    save_papers(filename, json_data)
+
+def link_label(url):
+    """Short name of the site a paper URL points to."""
+    if 'arxiv.org' in url:
+        return 'arXiv'
+    if 'doi.org' in url:
+        return 'DOI'
+    return 'Europe PMC'
+
+def render_paper_row(record):
+    """
+    Render a paper record as a markdown table row.
+    
+    Args:
+        record: Paper record (see paper_store.FIELDS)
+    
+    Returns:
+        Row string ending with a newline
+    """
+    code = f"**[link]({record['code_url']})**" if record.get('code_url') else ''
+    title = record['title'].replace('|', '\\|')
+    link = "[{}]({})".format(record['id'], record['url'])
+    if record.get('alt_url'):
+        link += ", [{}]({})".format(link_label(record['alt_url']), record['alt_url'])
+    return "|**{}**|**{}**|{} et.al.|{}|{}|\n".format(
+        record['date'], title, record['first_author'], link, code)
+
+_MATH = re.compile(r"\$.*\$")
+
+def pretty_math(s: str) -> str:
+    """Format LaTeX math expressions with proper spacing."""
+    match = _MATH.search(s)
+    if match is None:
+        return s
+    math_start, math_end = match.span()
+    space_trail = space_leading = ''
+    if s[:math_start][-1] != ' ' and '*' != s[:math_start][-1]:
+        space_trail = ' '
+    if s[math_end:][0] != ' ' and '*' != s[math_end:][0]:
+        space_leading = ' '
+    ret = s[:math_start]
+    ret += f'{space_trail}${match.group()[1:-1].strip()}${space_leading}'
+    ret += s[math_end:]
+    return ret
+
+@functools.lru_cache(maxsize=None)
+def renderer_digest():
+    """
+    Digest of the code that renders a topic section.
+    
+    Part of every fragment key, so cached sections are rendered again after
+    render_section() or one of its helpers changed. Falls back to the
+    bytecode where the source is not available.
+    """
+    parts = [_MATH.pattern]
+    for function in (render_section, render_paper_row, pretty_math, link_label, slugify):
+        try:
+            parts.append(inspect.getsource(function))
+        except (OSError, TypeError):
+            parts.append(function.__code__.co_code.hex())
+    return fragment_key(*parts)
+
+def render_section(keyword, papers, to_web=False, use_title=True,
+                   max_rows=None, manifest_url=None, fragments=None):
+    """
+    Render the markdown of one topic: header, table and "load older" button.
+    
+    Args:
+        keyword: Topic name
+        papers: Dictionary of paper key -> record
+        to_web: Whether to format for web display
+        use_title: Whether to write the table header
+        max_rows: Only write the newest max_rows papers (requires manifest_url)
+        manifest_url: URL of the shard manifest, relative to the page
+        fragments: Optional FragmentCache; a section whose papers, options
+            and rendering code are unchanged is returned from it without
+            being rendered again
+    
+    Returns:
+        Markdown text of the section
+    """
+    key = None
+    if fragments is not None:
+        key = fragment_key(renderer_digest(), keyword, papers, to_web, use_title,
+                           max_rows, manifest_url)
+        text = fragments.get(key)
+        if text is not None:
+            return text
+
+    parts = [f"## {keyword}\n\n"]
+
+    if use_title:
+        if to_web:
+            parts.append("| Publish Date | Title | Authors | PDF | Code |\n"
+                         "|:---------|:-----------------------|:---------|:------|:------|\n")
+        else:
+            parts.append("|Publish Date|Title|Authors|PDF|Code|\n"
+                         "|---|---|---|---|---|\n")
+
+    if max_rows and manifest_url:
+        # Newest papers first, in the same order as the shards
+        records = sorted((v for v in papers.values() if v is not None),
+                         key=lambda r: (r['date'], r['id']), reverse=True)
+        older = len(records) - max_rows
+        records = records[:max_rows]
+    else:
+        # Sort papers by key, newest arXiv IDs first
+        records = [papers[k] for k in sorted(papers, reverse=True) if papers[k] is not None]
+        older = 0
+
+    parts.extend(pretty_math(render_paper_row(v)) for v in records)
+    parts.append("\n")
+
+    # Older papers are fetched from the shards when asked for
+    if older > 0:
+        parts.append(f"<div class=\"older-papers\" data-manifest=\"{manifest_url}\" "
+                     f"data-topic=\"{slugify(keyword)}\" data-offset=\"{max_rows}\" "
+                     f"data-remaining=\"{older}\">\n"
+                     f"    <button type=\"button\">Load older papers ({older} more)</button>\n"
+                     "</div>\n\n")
+
+    text = ''.join(parts)
+    if fragments is not None:
+        fragments.set(key, text)
+    return text
 
 def json_to_md(filename, md_filename,
                task='',
@@ -355,10 +1368,18 @@ def json_to_md(filename, md_filename,
                use_title=True,
                use_tc=True,
                show_badge=True,
-               use_b2t=True):
+               use_b2t=True,
+               search_index=None,
+               max_rows=None,
+               shards=None,
+               data=None,
+               fragments=None):
     """
     Convert JSON paper data to Markdown format.
     
+    The page is assembled in memory and written with a single call; topic
+    sections come from render_section(), reusing cached fragments.
+    
     Args:
         filename: Input JSON file path
         md_filename: Output Markdown file path
@@ -368,181 +1389,263 @@ def json_to_md(filename, md_filename,
         use_tc: Whether to include table of contents
         show_badge: Whether to include badges
         use_b2t: Whether to include back-to-top links
+        search_index: Path of the prebuilt search index queried by the web
+            page's quick filter (written alongside the page, to_web only)
+        max_rows: Write only the newest max_rows papers of each topic inline;
+            the web page loads older ones on demand from the JSON shards
+            (requires shards and to_web)
+        shards: Directory of the per-topic / per-month shards (see web_export)
+        data: Already loaded paper store; filename is only read if omitted
+        fragments: Optional FragmentCache of rendered topic sections
     """
-    def pretty_math(s: str) -> str:
-        """Format LaTeX math expressions with proper spacing."""
-        match = re.search(r"\$.*\$", s)
-        if match is None:
-            return s
-        math_start, math_end = match.span()
-        space_trail = space_leading = ''
-        if s[:math_start][-1] != ' ' and '*' != s[:math_start][-1]:
-            space_trail = ' '
-        if s[math_end:][0] != ' ' and '*' != s[math_end:][0]:
-            space_leading = ' '
-        ret = s[:math_start]
-        ret += f'{space_trail}${match.group()[1:-1].strip()}${space_leading}'
-        ret += s[math_end:]
-        return ret
-
     DateNow = datetime.date.today()
     DateNow = str(DateNow)
     DateNow = DateNow.replace('-', '.')
 
-    with open(filename, "r", encoding='utf-8') as f:
-        content = f.read()
-        if not content:
-            data = {}
-        else:
-            data = json.loads(content)
+    if data is None:
+        data = load_papers(filename)
 
-    # Create/clear the markdown file
-    with open(md_filename, "w+", encoding='utf-8') as f:
-        pass
+    index_url = None
+    if to_web and search_index:
+        write_search_index(data, search_index)
+        index_url = os.path.relpath(search_index, os.path.dirname(md_filename) or '.')
+        index_url = index_url.replace(os.sep, '/')
 
-    # Write paper data to markdown file
-    with open(md_filename, "a+", encoding='utf-8') as f:
+    # Per-topic / per-month shards loaded lazily by the web pages
+    if to_web and shards:
+        write_shards(data, shards)
 
-        if use_title and to_web:
-            f.write("---\n")
-            f.write("layout: papers\n")
-            f.write("title: AI4Sarcopenia Literature Daily\n")
-            f.write("nav_order: 1\n")
-            f.write(f"last_updated: {DateNow}\n")
-            f.write("---\n\n")
+    manifest_url = None
+    if to_web and max_rows and shards:
+        manifest_url = os.path.relpath(os.path.join(shards, MANIFEST),
+                                       os.path.dirname(md_filename) or '.')
+        manifest_url = manifest_url.replace(os.sep, '/')
 
-        if use_title:
-            f.write("## Updated on " + DateNow + "\n")
-        else:
-            f.write("> Updated on " + DateNow + "\n")
+    parts = []
+    out = parts.append
 
-        f.write("> Usage instructions: [here](./README.md)\n\n")
+    if use_title and to_web:
+        out("---\n")
+        out("layout: papers\n")
+        out("title: AI4Sarcopenia Literature Daily\n")
+        out("nav_order: 1\n")
+        out(f"last_updated: {DateNow}\n")
+        out("---\n\n")
 
-        if to_web:
-            # Persistent notice for stale page issues
-            f.write((
-                "<div style=\"margin:0.85rem 0 0.5rem;padding:0.9rem 1rem;background:#fffbea;"
-                "border:1px solid #f0c36d;border-radius:10px;font-size:1rem;font-weight:700;color:#4a3200;\">\n"
-                "    ⚠️ If the page looks blank, press <strong>F5</strong> to refresh the data.\n"
-                "</div>\n\n"
-            ))
-
-            # Quick filter UI for in-page search
-            f.write((
-                "<div style=\"margin:0.5rem 0 1rem;padding:0.75rem 0.95rem;background:#f4f6fb;"
-                "border:1px solid #d9deed;border-radius:10px;\">\n"
-                "    <label for=\"page-search\" style=\"display:block;font-weight:700;margin-bottom:0.35rem;"
-                "color:#1f2a44;\">Quick filter (titles & authors)</label>\n"
-                "    <input id=\"page-search\" type=\"text\" placeholder=\"Type to search across all sections\""
-                " style=\"width:100%;padding:0.65rem 0.75rem;border:2px solid #d9deed;border-radius:8px;"
-                "font-size:0.95rem;\">\n"
-                "    <div id=\"page-search-status\" style=\"margin-top:0.35rem;font-size:0.9rem;color:#4a4f63;\">"
-                "Showing all papers.</div>\n"
-                "</div>\n\n"
-            ))
-
-        # Add table of contents
-        if use_tc:
-            f.write("<details>\n")
-            f.write("  <summary>Table of Contents</summary>\n")
-            f.write("  <ol>\n")
-            for keyword in data.keys():
-                day_content = data[keyword]
-                if not day_content:
-                    continue
-                kw = keyword.replace(' ', '-')
-                f.write(f"    <li><a href=#{kw.lower()}>{keyword}</a></li>\n")
-            f.write("  </ol>\n")
-            f.write("</details>\n\n")
+    if use_title:
+        out("## Updated on " + DateNow + "\n")
+    else:
+        out("> Updated on " + DateNow + "\n")
+
+    out("> Usage instructions: [here](./README.md)\n\n")
+
+    if to_web:
+        # Persistent notice for stale page issues
+        out((
+            "<div style=\"margin:0.85rem 0 0.5rem;padding:0.9rem 1rem;background:#fffbea;"
+            "border:1px solid #f0c36d;border-radius:10px;font-size:1rem;font-weight:700;color:#4a3200;\">\n"
+            "    ⚠️ If the page looks blank, press <strong>F5</strong> to refresh the data.\n"
+            "</div>\n\n"
+        ))
 
+        # Quick filter UI for in-page search
+        if index_url:
+            label = "Quick search (titles, authors & abstracts)"
+            index_attr = f" data-index=\"{index_url}\""
+            topic_select = (
+                "    <select id=\"page-search-topic\" style=\"margin-top:0.5rem;padding:0.4rem 0.5rem;"
+                "border:2px solid #d9deed;border-radius:8px;font-size:0.9rem;\">"
+                "<option value=\"\">All topics</option></select>\n"
+            )
+        else:
+            label = "Quick filter (titles & authors)"
+            index_attr = topic_select = ""
+        out((
+            "<div style=\"margin:0.5rem 0 1rem;padding:0.75rem 0.95rem;background:#f4f6fb;"
+            "border:1px solid #d9deed;border-radius:10px;\">\n"
+            "    <label for=\"page-search\" style=\"display:block;font-weight:700;margin-bottom:0.35rem;"
+            f"color:#1f2a44;\">{label}</label>\n"
+            "    <input id=\"page-search\" type=\"text\" placeholder=\"Type to search across all sections\""
+            " style=\"width:100%;padding:0.65rem 0.75rem;border:2px solid #d9deed;border-radius:8px;"
+            f"font-size:0.95rem;\"{index_attr}>\n"
+            f"{topic_select}"
+            "    <div id=\"page-search-status\" style=\"margin-top:0.35rem;font-size:0.9rem;color:#4a4f63;\">"
+            "Showing all papers.</div>\n"
+            "    <div id=\"page-search-results\"></div>\n"
+            "</div>\n\n"
+        ))
+
+    # Add table of contents
+    if use_tc:
+        out("<details>\n")
+        out("  <summary>Table of Contents</summary>\n")
+        out("  <ol>\n")
         for keyword in data.keys():
             day_content = data[keyword]
             if not day_content:
                 continue
-            
-            # Write section header
-            f.write(f"## {keyword}\n\n")
-
-            if use_title:
-                if to_web:
-                    f.write("| Publish Date | Title | Authors | PDF | Code |\n")
-                    f.write("|:---------|:-----------------------|:---------|:------|:------|\n")
-                else:
-                    f.write("|Publish Date|Title|Authors|PDF|Code|\n")
-                    f.write("|---|---|---|---|---|\n")
-
-            # Sort papers by date
-            day_content = sort_papers(day_content)
-
-            for _, v in day_content.items():
-                if v is not None:
-                    f.write(pretty_math(v))
-
-            f.write("\n")
-
-            # Add back to top link
-            if use_b2t:
-                top_info = f"#Updated on {DateNow}"
-                top_info = top_info.replace(' ', '-').replace('.', '')
-                f.write(f"<p align=right>(<a href={top_info.lower()}>back to top</a>)</p>\n\n")
-
-        if show_badge:
-            # Badge definitions for AI4Sarcopenia Literature Daily
-            f.write((f"[contributors-shield]: https://img.shields.io/github/"
-                     f"contributors/aizierjiang/AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
-            f.write((f"[contributors-url]: https://github.com/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily/graphs/contributors\n"))
-            f.write((f"[forks-shield]: https://img.shields.io/github/forks/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
-            f.write((f"[forks-url]: https://github.com/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily/network/members\n"))
-            f.write((f"[stars-shield]: https://img.shields.io/github/stars/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
-            f.write((f"[stars-url]: https://github.com/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily/stargazers\n"))
-            f.write((f"[issues-shield]: https://img.shields.io/github/issues/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
-            f.write((f"[issues-url]: https://github.com/aizierjiang/"
-                     f"AI4SarcopeniaLiteratureDaily/issues\n\n"))
-
-        # Reattach the client-side filter script for the web page
-        if to_web:
-            f.write(
-                "<script>\n"
-                "    document.addEventListener('DOMContentLoaded', () => {\n"
-                "        const input = document.getElementById('page-search');\n"
-                "        const status = document.getElementById('page-search-status');\n"
-                "        if (!input || !status) return;\n"
-                "\n"
-                "        // Collect all table rows once\n"
-                "        const rows = Array.from(document.querySelectorAll('table tbody tr'));\n"
-                "        const sections = rows.map(row => ({\n"
-                "            row,\n"
-                "            text: row.innerText.toLowerCase(),\n"
-                "        }));\n"
-                "\n"
-                "        function applyFilter(term) {\n"
-                "            const q = term.trim().toLowerCase();\n"
-                "            let visible = 0;\n"
-                "\n"
-                "            sections.forEach(({ row, text }) => {\n"
-                "                const match = !q || text.includes(q);\n"
-                "                row.style.display = match ? '' : 'none';\n"
-                "                if (match) visible += 1;\n"
-                "            });\n"
-                "\n"
-                "            status.textContent = q\n"
-                "                ? `Filtered: ${visible} paper${visible === 1 ? '' : 's'} match \"${term}\"`\n"
-                "                : 'Showing all papers.';\n"
-                "        }\n"
-                "\n"
-                "        input.addEventListener('input', (e) => applyFilter(e.target.value));\n"
-                "    });\n"
-                "</script>\n"
-            )
+            kw = keyword.replace(' ', '-')
+            out(f"    <li><a href=#{kw.lower()}>{keyword}</a></li>\n")
+        out("  </ol>\n")
+        out("</details>\n\n")
+
+    for keyword, day_content in data.items():
+        if not day_content:
+            continue
+        out(render_section(keyword, day_content, to_web=to_web, use_title=use_title,
+                           max_rows=max_rows if manifest_url else None,
+                           manifest_url=manifest_url, fragments=fragments))
+
+        # Add back to top link
+        if use_b2t:
+            top_info = f"#Updated on {DateNow}"
+            top_info = top_info.replace(' ', '-').replace('.', '')
+            out(f"<p align=right>(<a href={top_info.lower()}>back to top</a>)</p>\n\n")
+
+    if show_badge:
+        # Badge definitions for AI4Sarcopenia Literature Daily
+        out((f"[contributors-shield]: https://img.shields.io/github/"
+             f"contributors/aizierjiang/AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
+        out((f"[contributors-url]: https://github.com/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily/graphs/contributors\n"))
+        out((f"[forks-shield]: https://img.shields.io/github/forks/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
+        out((f"[forks-url]: https://github.com/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily/network/members\n"))
+        out((f"[stars-shield]: https://img.shields.io/github/stars/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
+        out((f"[stars-url]: https://github.com/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily/stargazers\n"))
+        out((f"[issues-shield]: https://img.shields.io/github/issues/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily.svg?style=for-the-badge\n"))
+        out((f"[issues-url]: https://github.com/aizierjiang/"
+             f"AI4SarcopeniaLiteratureDaily/issues\n\n"))
+
+    # Client-side search over the prebuilt index (PaperSearch lives in
+    # assets/js/site-enhancements.js); no table row is read or touched
+    if to_web and index_url:
+        out(
+            "<script>\n"
+            "    document.addEventListener('DOMContentLoaded', () => {\n"
+            "        const input = document.getElementById('page-search');\n"
+            "        const topic = document.getElementById('page-search-topic');\n"
+            "        const status = document.getElementById('page-search-status');\n"
+            "        const results = document.getElementById('page-search-results');\n"
+            "        if (!input || !status || !results || !window.PaperSearch) return;\n"
+            "\n"
+            "        const MAX_SHOWN = 100;\n"
+            "        const escape = s => String(s).replace(/[&<>\"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '\"': '&quot;'}[c]));\n"
+            "        let index = null;\n"
+            "\n"
+            "        function ensureIndex() {\n"
+            "            return PaperSearch.load(input.dataset.index).then(loaded => {\n"
+            "                if (!index) {\n"
+            "                    index = loaded;\n"
+            "                    index.topics.forEach(name => topic && topic.add(new Option(name, name)));\n"
+            "                }\n"
+            "                return index;\n"
+            "            });\n"
+            "        }\n"
+            "\n"
+            "        function applyFilter() {\n"
+            "            const term = input.value;\n"
+            "            const selected = topic ? topic.value : '';\n"
+            "            if (!term.trim() && !selected) {\n"
+            "                results.innerHTML = '';\n"
+            "                status.textContent = 'Showing all papers.';\n"
+            "                return;\n"
+            "            }\n"
+            "            const docs = PaperSearch.search(index, term, { topic: selected });\n"
+            "            const rows = docs.slice(0, MAX_SHOWN).map(doc => {\n"
+            "                const [id, date, title, author, url, code] = index.docs[doc];\n"
+            "                return `<tr><td><strong>${escape(date)}</strong></td><td><strong>${escape(title)}</strong></td>`\n"
+            "                    + `<td>${escape(author)} et.al.</td><td><a href=\"${escape(url)}\">${escape(id)}</a></td>`\n"
+            "                    + `<td>${code ? `<a href=\"${escape(code)}\"><strong>link</strong></a>` : ''}</td></tr>`;\n"
+            "            });\n"
+            "            results.innerHTML = rows.length\n"
+            "                ? '<table><thead><tr><th>Publish Date</th><th>Title</th><th>Authors</th><th>PDF</th><th>Code</th></tr></thead>'\n"
+            "                    + `<tbody>${rows.join('')}</tbody></table>`\n"
+            "                : '';\n"
+            "            const shown = docs.length > MAX_SHOWN ? ` (showing the newest ${MAX_SHOWN})` : '';\n"
+            "            status.textContent = `Found ${docs.length} paper${docs.length === 1 ? '' : 's'}${shown}`;\n"
+            "        }\n"
+            "\n"
+            "        const onChange = () => ensureIndex().then(applyFilter).catch(error => {\n"
+            "            status.textContent = 'Search index unavailable.';\n"
+            "            console.error('Search index error:', error);\n"
+            "        });\n"
+            "        input.addEventListener('focus', () => ensureIndex().catch(() => {}), { once: true });\n"
+            "        input.addEventListener('input', onChange);\n"
+            "        if (topic) topic.addEventListener('change', onChange);\n"
+            "    });\n"
+            "</script>\n"
+        )
+    # Reattach the client-side filter script for the web page
+    elif to_web:
+        out(
+            "<script>\n"
+            "    document.addEventListener('DOMContentLoaded', () => {\n"
+            "        const input = document.getElementById('page-search');\n"
+            "        const status = document.getElementById('page-search-status');\n"
+            "        if (!input || !status) return;\n"
+            "\n"
+            "        // Collect all table rows once\n"
+            "        const rows = Array.from(document.querySelectorAll('table tbody tr'));\n"
+            "        const sections = rows.map(row => ({\n"
+            "            row,\n"
+            "            text: row.innerText.toLowerCase(),\n"
+            "        }));\n"
+            "\n"
+            "        function applyFilter(term) {\n"
+            "            const q = term.trim().toLowerCase();\n"
+            "            let visible = 0;\n"
+            "\n"
+            "            sections.forEach(({ row, text }) => {\n"
+            "                const match = !q || text.includes(q);\n"
+            "                row.style.display = match ? '' : 'none';\n"
+            "                if (match) visible += 1;\n"
+            "            });\n"
+            "\n"
+            "            status.textContent = q\n"
+            "                ? `Filtered: ${visible} paper${visible === 1 ? '' : 's'} match \"${term}\"`\n"
+            "                : 'Showing all papers.';\n"
+            "        }\n"
+            "\n"
+            "        input.addEventListener('input', (e) => applyFilter(e.target.value));\n"
+            "    });\n"
+            "</script>\n"
+        )
+
+    # Write paper data to markdown file (replaced atomically, only if changed)
+    with atomic_write(md_filename) as f:
+        f.write(''.join(parts))
 
     logging.info(f"{task} finished")
 
+def render_outputs(outputs, fragment_cache=None, data=None):
+    """
+    Render all markdown outputs (and their web assets) in one pass.
+    
+    Each JSON file is loaded once, however many outputs use it, and topic
+    sections are shared through one FragmentCache.
+    
+    Args:
+        outputs: List of json_to_md keyword arguments, one per output file
+        fragment_cache: Path of the persistent fragment cache, None to only
+            reuse fragments within this run
+        data: Paper store used for every output instead of reading the JSON
+            files (the export of the paper database)
+    """
+    fragments = FragmentCache(fragment_cache)
+    loaded = dict()
+    for output in outputs:
+        filename = output['filename']
+        if filename not in loaded:
+            loaded[filename] = data if data is not None else load_papers(filename)
+        json_to_md(data=loaded[filename], fragments=fragments, **output)
+    fragments.save()
+    run_report.current().record_cache('fragments', fragments.hits, fragments.misses)
+
 def demo(**config):
     """
     Main function to fetch papers and generate markdown files.
@@ -550,53 +1653,183 @@ def demo(**config):
     Args:
         **config: Configuration dictionary containing all settings
     """
+    report = run_report.start_run()
+    cache = open_cache(config)
+    db = open_paper_db(config, seed_files=get_json_files(config))
+    engine = open_engine(config)
+    journal = open_journal(config, resume=config.get('resume', False))
+    try:
+        run_pipeline(cache=cache, db=db, engine=engine, journal=journal, **config)
+        if journal is not None:
+            journal.done()
+    finally:
+        if journal is not None:
+            journal.close()
+        if engine is not None:
+            engine.close()
+        if cache is not None:
+            report.record_cache('enrichment', cache.hits, cache.misses)
+            cache.close()
+        if db is not None:
+            db.close()
+        # Also written for failed runs, to see where they got stuck
+        if config.get('run_report_path'):
+            report.write(config['run_report_path'])
+        if config.get('print_report'):
+            print(report.summary())
+
+def get_json_files(config):
+    """Return the JSON files written by this configuration, without duplicates."""
+    json_files = []
+    if config['publish_readme']:
+        json_files.append(config['json_readme_path'])
+    if config['publish_gitpage']:
+        json_files.append(config['json_gitpage_path'])
+    return list(dict.fromkeys(json_files))
+
+def run_pipeline(cache=None, db=None, engine=None, journal=None, **config):
+    """
+    Fetch papers (or refresh links) and regenerate the JSON and markdown outputs.
+    
+    Args:
+        cache: Optional EnrichmentCache for code-link lookups
+        db: Optional PaperDB; when given it is the system of record and the
+            JSON files are exported from it
+        engine: Optional AsyncEngine sending the requests
+        journal: Optional RunJournal; searches and topics completed by an
+            interrupted run are not repeated (see run_journal)
+        **config: Configuration dictionary containing all settings
+    """
     data_collector = []
-    data_collector_web = []
 
     keywords = config['kv']
     max_results = config['max_results']
     publish_readme = config['publish_readme']
     publish_gitpage = config['publish_gitpage']
     show_badge = config['show_badge']
+    max_workers = config.get('max_workers', 1)
+    incremental = config.get('incremental', False)
 
     b_update = config['update_paper_links']
     logging.info(f'Update Paper Link = {b_update}')
+
+    configure_host_limits(config.get('host_concurrency'))
+    configure_rate_limits(config.get('rate_limits'))
+    configure_http(config.get('http'))
+    configure_endpoints(config)
+    harvester = None
+
+    # The link refresh time budget is shared by both JSON files
+    refresh = config.get('link_refresh') or {}
+    refresh_deadline = None
+    if refresh.get('time_budget_minutes'):
+        refresh_deadline = time.monotonic() + refresh['time_budget_minutes'] * 60
+
+    def refresh_links(json_file):
+        time_budget = None
+        if refresh_deadline is not None:
+            time_budget = max(0, refresh_deadline - time.monotonic())
+        options = dict(cache=cache, max_workers=refresh.get('max_workers', 1),
+                       time_budget=time_budget, request_budget=refresh.get('request_budget'),
+                       engine=engine, journal=journal)
+        metadata = config.get('metadata_refresh') or {}
+        if metadata.get('enabled'):
+            options.update(metadata_batch_size=metadata.get('batch_size', 200),
+                           metadata_requests=metadata.get('max_requests'))
+        if db is not None:
+            update_db_paper_links(db, **options)
+        else:
+            update_paper_links(json_file, **options)
     
-    if not config['update_paper_links']:
-        logging.info("GET daily papers begin")
-        for topic, keyword in keywords.items():
-            logging.info(f"Keyword: {topic}")
-            data, data_web = get_daily_papers(topic, query=keyword, max_results=max_results)
-            data_collector.append(data)
-            data_collector_web.append(data_web)
-            print("\n")
+    done_topics = journal.topics if journal is not None else {}
+    remaining = {topic: query for topic, query in keywords.items() if topic not in done_topics}
+    if not config['update_paper_links'] and not remaining:
+        logging.info("All topics were completed by the interrupted run")
+    elif not config['update_paper_links']:
+        logging.info(f"GET daily papers begin (max_workers = {max_workers})")
+        if done_topics:
+            logging.info(f"Resume: {len(done_topics)} topics completed, "
+                         f"{len(remaining)} left to search")
+        harvester = open_harvester(config)
+        known = dict()
+        with run_report.stage('load'):
+            if incremental:
+                if db is not None:
+                    known = db.known_papers()
+                else:
+                    known = load_known_papers(get_json_files(config))
+                logging.info(f"Incremental run: {sum(len(v) for v in known.values())} stored papers")
+            # New results are deduplicated against everything stored so far
+            if db is not None:
+                archive = db.export()
+            else:
+                archive = load_archive(get_json_files(config))
+        since = None
+        if incremental and not config.get('backfill'):
+            since = stop_dates(archive, remaining, config.get('incremental_lookback_days', 3))
+        data_collector = get_all_daily_papers(
+            remaining, max_results=max_results, cache=cache,
+            known=known, max_workers=max_workers,
+            combined=config.get('combined_query'),
+            filters={topic: config['keywords'][topic] for topic in remaining},
+            harvester=harvester, archive=archive, dedup=config.get('dedup'),
+            since=since, github=open_github_resolver(config, github_url), engine=engine,
+            journal=journal)
+        if journal is not None:
+            for topic_papers in data_collector:
+                for topic, papers in topic_papers.items():
+                    journal.topic(topic, papers)
         logging.info("GET daily papers end")
+    if journal is not None and not config['update_paper_links']:
+        # Config order, with the topics of the interrupted run
+        data_collector = [{topic: done_topics[topic]} for topic in keywords]
 
-    # 1. Update README.md file
+    outputs = []
+    # 1. README.md
     if publish_readme:
-        json_file = config['json_readme_path']
-        md_file = config['md_readme_path']
-        
-        if config['update_paper_links']:
-            update_paper_links(json_file)
-        else:
-            update_json_file(json_file, data_collector)
-        
-        json_to_md(json_file, md_file, task='Update Readme', show_badge=show_badge)
+        outputs.append(dict(filename=config['json_readme_path'],
+                            md_filename=config['md_readme_path'],
+                            task='Update Readme', show_badge=show_badge))
 
-    # 2. Update docs/index.md file (for GitHub Pages)
+    # 2. docs/index.md (for GitHub Pages)
     if publish_gitpage:
-        json_file = config['json_gitpage_path']
-        md_file = config['md_gitpage_path']
-        
+        outputs.append(dict(filename=config['json_gitpage_path'],
+                            md_filename=config['md_gitpage_path'],
+                            task='Update GitPage',
+                            to_web=True, show_badge=show_badge,
+                            use_tc=False, use_b2t=False,
+                            search_index=config.get('search_index_path'),
+                            max_rows=config.get('web_max_rows'),
+                            shards=config.get('shards_path')))
+
+    # Update the store first, then render all outputs in one pass
+    if db is not None:
         if config['update_paper_links']:
-            update_paper_links(json_file)
+            with run_report.stage('link_refresh'):
+                refresh_links(None)
         else:
-            update_json_file(json_file, data_collector)
-        
-        json_to_md(json_file, md_file, task='Update GitPage',
-                   to_web=True, show_badge=show_badge,
-                   use_tc=False, use_b2t=False)
+            with run_report.stage('store'):
+                db.upsert(data_collector)
+        with run_report.stage('store'):
+            data = db.export()
+            for json_file in get_json_files(config):
+                save_papers(json_file, data)
+        with run_report.stage('render'):
+            render_outputs(outputs, fragment_cache=config.get('fragment_cache_path'), data=data)
+    else:
+        for json_file in get_json_files(config):
+            if config['update_paper_links']:
+                with run_report.stage('link_refresh'):
+                    refresh_links(json_file)
+            else:
+                with run_report.stage('store'):
+                    update_json_file(json_file, data_collector)
+        with run_report.stage('render'):
+            render_outputs(outputs, fragment_cache=config.get('fragment_cache_path'))
+
+    # The Europe PMC date windows only advance once the results are stored
+    if harvester is not None:
+        harvester.commit()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -607,8 +1840,26 @@ if __name__ == "__main__":
     parser.add_argument('--update_paper_links', default=False,
                         action="store_true",
                         help='Update paper links for existing entries instead of fetching new papers')
+    parser.add_argument('--backfill', default=False,
+                        action="store_true",
+                        help='Ignore the Europe PMC harvest state and harvest again from backfill_from')
+    parser.add_argument('--print_report', default=False,
+                        action="store_true",
+                        help='Print a summary table of the run report (timings, requests, caches)')
+    parser.add_argument('--resume', default=False,
+                        action="store_true",
+                        help='Continue an interrupted run from its journal (run_journal_path)')
+    parser.add_argument('--migrate', default=False,
+                        action="store_true",
+                        help='Convert the JSON files from markdown rows to structured records and exit')
     args = parser.parse_args()
     
     config = load_config(args.config_path)
-    config = {**config, 'update_paper_links': args.update_paper_links}
+    if args.migrate:
+        for key in ('json_readme_path', 'json_gitpage_path'):
+            migrate_json_file(config[key])
+        raise SystemExit(0)
+    config = {**config, 'update_paper_links': args.update_paper_links,
+              'backfill': args.backfill, 'print_report': args.print_report,
+              'resume': args.resume}
     demo(**config)
@@ -0,0 +1,191 @@
+"""
+AI4Sarcopenia Literature Daily - Cross-source duplicate detection
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+The same work is often listed as an arXiv preprint and later as a PubMed
+(MED) or preprint-server (PPR) record under a different key. Papers of
+different sources are treated as duplicates when they share a DOI, or when
+their first authors agree and their titles are near-identical (MinHash over
+character shingles) or similar within the same first-author/year block.
+
+Candidates are found through hash buckets (DOI, MinHash LSH bands,
+author-year blocks), so each paper is only compared with the few papers
+sharing a bucket: adding n papers takes roughly linear time.
+"""
+
+import re
+import zlib
+import random
+
+from topic_matcher import tokenize
+
+SHINGLE_SIZE = 5
+NUM_PERM = 32
+BANDS = 16
+_ROWS = NUM_PERM // BANDS
+_MASK = (1 << 64) - 1
+
+# Hash functions (a * h + b) mod 2^64 with odd a; fixed seed so signatures
+# do not change between runs
+_rng = random.Random(20150101)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+# Author-year blocks larger than this (very common names) are too unspecific
+# to be scanned; near-identical titles are still found through the bands
+MAX_BLOCK = 100
+
+_DOI_URL = re.compile(r"^https?://(dx\.)?doi\.org/", re.I)
+
+
+def normalize_doi(doi):
+    """Lowercase DOI without resolver prefix, or None."""
+    if not doi:
+        return None
+    return _DOI_URL.sub('', doi.strip()).lower() or None
+
+
+def doi_from_url(url):
+    """DOI of a https://doi.org/... paper URL, or None."""
+    if url and _DOI_URL.match(url):
+        return normalize_doi(url)
+    return None
+
+
+def shingles(title):
+    """Set of character shingles of a normalized title."""
+    text = ' '.join(tokenize(title))
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    """MinHash signature (NUM_PERM values) of a shingle set."""
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    return [min([(a * h + b) & _MASK for h in hashes]) for a, b in _PERMUTATIONS]
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def author_tokens(name):
+    """Name parts of at least two letters ("Kanavati F" and "Fahdi Kanavati" share 'kanavati')."""
+    return {token for token in tokenize(name) if len(token) > 1 and not token.isdigit()}
+
+
+class Deduplicator:
+    """
+    Incremental duplicate finder.
+
+    Every paper is added with add(); it either joins the cluster of an
+    earlier paper it duplicates or starts a new cluster keyed by its own
+    paper key. A cluster holds at most one paper per source: within a
+    source the paper key is already unique.
+    """
+
+    def __init__(self, title_threshold=0.8, block_threshold=0.5):
+        """
+        Args:
+            title_threshold: Title similarity (Jaccard of shingles) above which
+                papers with matching first authors are duplicates; None only
+                merges papers with the same DOI
+            block_threshold: Lower similarity accepted inside a first-author /
+                publication-year block (year +-1, preprint vs. journal)
+        """
+        self.title_threshold = title_threshold
+        self.block_threshold = block_threshold
+        self._papers = dict()     # paper key -> (cluster, source, doi, shingles, authors, year)
+        self._doi = dict()        # doi -> [paper key]
+        self._bands = dict()      # (band no, band hash) -> [paper key]
+        self._blocks = dict()     # (author token, year) -> [paper key]
+        self._sources = dict()    # cluster -> sources of its papers
+        self.merged = 0
+
+    def _candidates(self, doi, bands, authors, year):
+        keys = list(self._doi.get(doi, ())) if doi else []
+        for band in bands:
+            keys.extend(self._bands.get(band, ()))
+        if year is not None:
+            for token in authors:
+                for y in (year - 1, year, year + 1):
+                    block = self._blocks.get((token, y), ())
+                    if len(block) <= MAX_BLOCK:
+                        keys.extend(block)
+        return dict.fromkeys(keys)
+
+    def _is_duplicate(self, other, doi, shingle_set, authors, year):
+        _, _, other_doi, other_shingles, other_authors, other_year = other
+        if doi and doi == other_doi:
+            return True
+        if self.title_threshold is None:
+            return False
+        if authors and other_authors and not authors & other_authors:
+            return False
+        similarity = jaccard(shingle_set, other_shingles)
+        if similarity >= self.title_threshold:
+            return True
+        return (similarity >= self.block_threshold and year is not None
+                and other_year is not None and abs(year - other_year) <= 1
+                and bool(authors & other_authors))
+
+    def add(self, paper_key, source, title, first_author='', year=None, doi=None):
+        """
+        Register a paper and find the cluster it belongs to.
+
+        Args:
+            paper_key: Key the paper is stored under
+            source: 'arxiv', 'MED', 'PPR', ...
+            title: Paper title
+            first_author: First author name
+            year: Publication year (int), None if unknown
+            doi: DOI, None if unknown
+
+        Returns:
+            Key of the cluster (the key of its first paper)
+        """
+        if paper_key in self._papers:
+            return self._papers[paper_key][0]
+
+        doi = normalize_doi(doi)
+        shingle_set = shingles(title)
+        signature = []
+        if shingle_set and self.title_threshold is not None:
+            signature = minhash(shingle_set)
+        bands = [(i, tuple(signature[i * _ROWS:(i + 1) * _ROWS]))
+                 for i in range(BANDS)] if signature else []
+        authors = author_tokens(first_author)
+
+        cluster = paper_key
+        for key in self._candidates(doi, bands, authors, year):
+            other = self._papers[key]
+            if source in self._sources[other[0]]:
+                continue
+            if self._is_duplicate(other, doi, shingle_set, authors, year):
+                cluster = other[0]
+                self.merged += 1
+                break
+
+        self._papers[paper_key] = (cluster, source, doi, shingle_set, authors, year)
+        self._sources.setdefault(cluster, set()).add(source)
+        if doi:
+            self._doi.setdefault(doi, []).append(paper_key)
+        for band in bands:
+            self._bands.setdefault(band, []).append(paper_key)
+        if year is not None:
+            for token in authors:
+                self._blocks.setdefault((token, year), []).append(paper_key)
+        return cluster
+
+    def add_record(self, paper_key, record):
+        """Register a stored paper record (see paper_store.FIELDS)."""
+        date = record.get('date') or ''
+        return self.add(paper_key, record.get('source'), record.get('title'),
+                        record.get('first_author') or '',
+                        year=int(date[:4]) if date[:4].isdigit() else None,
+                        doi=doi_from_url(record.get('url')))
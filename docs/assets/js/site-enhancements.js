@@ -42,6 +42,7 @@
     initSidebarTOC();
     initSearchFab();
     removeThemeSearchButton();
+    initOlderPapers();
   });
 
   // ============================================
@@ -417,7 +418,7 @@ function initSearchFab(){
     });
 
     btn.addEventListener('click', () => {
-      const input = document.querySelector('.search-input');
+      const input = document.getElementById('page-search') || document.querySelector('.search-input');
       if (input) {
         // Bring into view and focus
         window.scrollTo({ top: 0, behavior: 'smooth' });
@@ -443,3 +444,187 @@ function removeThemeSearchButton(){
     console.warn('Remove theme search button failed:', e);
   }
 }
+
+/**
+ * "Load older papers" buttons below the topic tables of index.md
+ *
+ * Only the newest papers of each topic are written into the page; older ones
+ * are appended page by page from the per-topic / per-month JSON shards listed
+ * in data/manifest.json (shards are ordered newest first, like the tables).
+ */
+function initOlderPapers(){
+  const PAGE_SIZE = 50;
+  const manifests = {};
+  const escape = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+
+  function loadManifest(url) {
+    if (!manifests[url]) {
+      manifests[url] = fetch(url).then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+      });
+    }
+    return manifests[url];
+  }
+
+  const link = (url, text) => `<a href="${escape(url)}" target="_blank" rel="noopener noreferrer">${escape(text)}</a>`;
+  const linkLabel = url => url.includes('arxiv.org') ? 'arXiv' : url.includes('doi.org') ? 'DOI' : 'Europe PMC';
+
+  function renderRow(record, labels) {
+    const cells = [
+      `<strong>${escape(record.date)}</strong>`,
+      `<strong>${escape(record.title)}</strong>`,
+      `${escape(record.first_author)} et.al.`,
+      link(record.url, record.id) + (record.alt_url ? ', ' + link(record.alt_url, linkLabel(record.alt_url)) : ''),
+      record.code_url ? `<strong>${link(record.code_url, 'link')}</strong>` : ''
+    ];
+    return '<tr>' + cells.map((cell, i) => `<td data-label="${escape(labels[i] || '')}">${cell}</td>`).join('') + '</tr>';
+  }
+
+  async function nextPage(container, state) {
+    if (!state.months) {
+      const manifest = await loadManifest(container.dataset.manifest);
+      const topic = manifest.topics.find(t => t.slug === container.dataset.topic);
+      const base = container.dataset.manifest.replace(/[^/]*$/, '');
+      state.months = topic ? topic.months.map(m => ({ ...m, url: base + m.file })) : [];
+      state.skip = parseInt(container.dataset.offset, 10) || 0;
+      state.buffer = [];
+    }
+    while (state.buffer.length < PAGE_SIZE && state.months.length) {
+      const month = state.months.shift();
+      // Months written inline in full are skipped without being fetched
+      if (state.skip >= month.count) {
+        state.skip -= month.count;
+        continue;
+      }
+      const records = await (await fetch(month.url)).json();
+      state.buffer.push(...records.slice(state.skip));
+      state.skip = 0;
+    }
+    return state.buffer.splice(0, PAGE_SIZE);
+  }
+
+  document.querySelectorAll('.older-papers').forEach(container => {
+    const button = container.querySelector('button');
+    const previous = container.previousElementSibling;
+    const table = previous && (previous.tagName === 'TABLE' ? previous : previous.querySelector('table'));
+    if (!button || !table) return;
+
+    const tbody = table.tBodies[0] || table.createTBody();
+    const labels = Array.from(table.querySelectorAll('thead th')).map(th => th.textContent.trim());
+    const state = {};
+    let remaining = parseInt(container.dataset.remaining, 10) || 0;
+
+    button.addEventListener('click', async () => {
+      button.disabled = true;
+      try {
+        const records = await nextPage(container, state);
+        tbody.insertAdjacentHTML('beforeend', records.map(r => renderRow(r, labels)).join(''));
+        remaining = Math.max(0, remaining - records.length);
+        if (records.length === 0 || remaining === 0) {
+          container.remove();
+          return;
+        }
+        button.textContent = `Load older papers (${remaining} more)`;
+      } catch (e) {
+        console.warn('Loading older papers failed:', e);
+        button.textContent = 'Could not load older papers, try again';
+      }
+      button.disabled = false;
+    });
+  });
+}
+
+/**
+ * Prebuilt search index (search-index.json, written by json_to_md)
+ *
+ * Layout: { stopwords, topics, docs: [[id, date, title, first_author, url, code_url, [topic no]]],
+ *           terms: { token: [first doc no, delta, ...] } }
+ * Documents are ordered newest first, so results come back in display order.
+ */
+window.PaperSearch = (function() {
+  'use strict';
+
+  const loaded = {};
+
+  function tokenize(text) {
+    return (text || '').toLowerCase().match(/[a-z0-9]+/g) || [];
+  }
+
+  function load(url) {
+    if (!loaded[url]) {
+      loaded[url] = fetch(url)
+        .then(response => {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          return response.json();
+        })
+        .then(index => {
+          index.stopwordSet = new Set(index.stopwords);
+          index.sortedTerms = Object.keys(index.terms).sort();
+          index.decoded = new Map();
+          return index;
+        });
+    }
+    return loaded[url];
+  }
+
+  // Decode (and memoize) the delta-encoded postings of a term
+  function postings(index, term) {
+    let list = index.decoded.get(term);
+    if (!list) {
+      const deltas = index.terms[term] || [];
+      list = new Array(deltas.length);
+      let doc = 0;
+      deltas.forEach((delta, i) => { doc += delta; list[i] = doc; });
+      index.decoded.set(term, list);
+    }
+    return list;
+  }
+
+  // Union of the postings of every term starting with prefix
+  function prefixPostings(index, prefix, maxTerms) {
+    const terms = index.sortedTerms;
+    let lo = 0, hi = terms.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (terms[mid] < prefix) lo = mid + 1; else hi = mid;
+    }
+    const docs = new Set();
+    for (let i = lo, n = 0; i < terms.length && terms[i].startsWith(prefix) && n < maxTerms; i++, n++) {
+      postings(index, terms[i]).forEach(doc => docs.add(doc));
+    }
+    return Array.from(docs).sort((a, b) => a - b);
+  }
+
+  /**
+   * Find the papers matching every word of query (the last word as a prefix,
+   * for search-as-you-type), optionally restricted to a topic and date range.
+   * Returns document numbers, newest first.
+   */
+  function search(index, query, options = {}) {
+    const words = tokenize(query).filter(w => !index.stopwordSet.has(w));
+    const prefixLast = words.length > 0 && /[a-z0-9]$/i.test(query.trim());
+    const lists = words.map((word, i) => (i === words.length - 1 && prefixLast)
+      ? prefixPostings(index, word, 200)
+      : postings(index, word));
+
+    let result;
+    if (lists.length === 0) {
+      result = index.docs.map((_, doc) => doc);
+    } else {
+      lists.sort((a, b) => a.length - b.length);
+      const others = lists.slice(1).map(list => new Set(list));
+      result = lists[0].filter(doc => others.every(set => set.has(doc)));
+    }
+
+    const topicNo = options.topic ? index.topics.indexOf(options.topic) : -1;
+    return result.filter(doc => {
+      const [, date, , , , , topics] = index.docs[doc];
+      return (topicNo < 0 || topics.includes(topicNo))
+        && (!options.from || date >= options.from)
+        && (!options.to || date <= options.to);
+    });
+  }
+
+  return { load, search, tokenize };
+})();
@@ -0,0 +1,124 @@
+"""
+AI4Sarcopenia Literature Daily - Persistent cache for code-link lookups
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Stores the answer of every paperswithcode / GitHub lookup in a small SQLite
+database so that reruns only query the APIs for answers that went stale.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+DAY = 24 * 60 * 60
+
+
+class EnrichmentCache:
+    """
+    SQLite-backed cache keyed by (paper key, lookup kind).
+
+    A stored value of None is a negative result ("no code found"). Positive
+    and negative results expire independently so missing links are
+    re-checked much more often than found ones. Every consecutive negative
+    answer doubles the TTL of the next one (up to miss_max_ttl_days), so
+    papers that never get code are re-checked less and less often.
+    """
+
+    def __init__(self, path, hit_ttl_days=90, miss_ttl_days=5, miss_max_ttl_days=120):
+        self.path = path
+        self.hit_ttl = hit_ttl_days * DAY
+        self.miss_ttl = miss_ttl_days * DAY
+        self.miss_max_ttl = max(miss_max_ttl_days, miss_ttl_days) * DAY
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            " paper_key TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " value TEXT,"
+            " checked_at REAL NOT NULL,"
+            " empty_checks INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (paper_key, kind))"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(lookups)")]
+        if "empty_checks" not in columns:
+            self._conn.execute(
+                "ALTER TABLE lookups ADD COLUMN empty_checks INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def _ttl(self, value, empty_checks):
+        if value is not None:
+            return self.hit_ttl
+        return min(self.miss_ttl * 2 ** max(0, empty_checks - 1), self.miss_max_ttl)
+
+    def get(self, paper_key, kind):
+        """
+        Look up a cached answer.
+
+        Returns:
+            Tuple (found, value); found is False when there is no fresh entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, checked_at, empty_checks FROM lookups "
+                "WHERE paper_key = ? AND kind = ?",
+                (paper_key, kind)).fetchone()
+            if row is not None:
+                value, checked_at, empty_checks = row
+                if time.time() - checked_at < self._ttl(value, empty_checks):
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def set(self, paper_key, kind, value):
+        """Store an answer (a URL, or None for a negative result)."""
+        with self._lock:
+            empty_checks = 0
+            if value is None:
+                row = self._conn.execute(
+                    "SELECT value, empty_checks FROM lookups WHERE paper_key = ? AND kind = ?",
+                    (paper_key, kind)).fetchone()
+                empty_checks = row[1] + 1 if row is not None and row[0] is None else 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups (paper_key, kind, value, checked_at, empty_checks) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (paper_key, kind, value, time.time(), empty_checks))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        logging.info(f"Enrichment cache {self.path}: {self.hits} hits, {self.misses} misses")
+
+
+def open_cache(config):
+    """
+    Open the enrichment cache described by the `enrichment_cache` config section.
+
+    Returns:
+        EnrichmentCache instance, or None if caching is disabled
+    """
+    options = config.get('enrichment_cache') or {}
+    path = options.get('path')
+    if not path:
+        return None
+    try:
+        return EnrichmentCache(path,
+                               hit_ttl_days=options.get('hit_ttl_days', 90),
+                               miss_ttl_days=options.get('miss_ttl_days', 5),
+                               miss_max_ttl_days=options.get('miss_max_ttl_days', 120))
+    except sqlite3.Error as e:
+        logging.warning(f"Could not open enrichment cache {path}: {e}")
+        return None
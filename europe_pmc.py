@@ -1,82 +1,194 @@
-import requests
+import os
+import json
 import datetime
 import logging
+import threading
+import http_client
+from paper_model import Paper
+from paper_store import atomic_write
+
+class EuropePMCPaper(Paper):
+    """Paper built from a Europe PMC `core` record; the record itself is not kept."""
+
+    __slots__ = ()
 
-class EuropePMCPaper:
     def __init__(self, data):
-        self.data = data
-        self.title = data.get('title')
-        self.summary = data.get('abstractText', '')
-        self.authors = [a.get('fullName') for a in data.get('authorList', {}).get('author', [])]
-        
+        source = data.get('source')
+        doi = data.get('doi')
         # Construct URL
-        if data.get('doi'):
-            self.entry_id = f"https://doi.org/{data.get('doi')}"
-        else:
-            self.entry_id = f"https://europepmc.org/article/{data.get('source')}/{data.get('id')}"
-            
-        self.paper_id = data.get('id')
-        self.source = data.get('source')
-        self.doi = data.get('doi')
-        
-        pub_date = data.get('firstPublicationDate')
-        if pub_date:
-            try:
-                self.published = datetime.datetime.strptime(pub_date, '%Y-%m-%d')
-            except ValueError:
-                # Try just year
-                try:
-                    self.published = datetime.datetime.strptime(data.get('pubYear'), '%Y')
-                except:
-                    self.published = datetime.datetime.now()
+        if doi:
+            entry_id = f"https://doi.org/{doi}"
         else:
-            self.published = datetime.datetime.now()
-            
-        self.updated = self.published
-        self.comment = f"Source: {self.source}"
-
-    def get_short_id(self):
-        return self.paper_id
+            entry_id = f"https://europepmc.org/article/{source}/{data.get('id')}"
+        super().__init__(source, data.get('id'), data.get('title'),
+                         summary=data.get('abstractText', ''),
+                         authors=[a.get('fullName') for a in data.get('authorList', {}).get('author', [])],
+                         doi=doi,
+                         entry_id=entry_id,
+                         comment=f"Source: {source}",
+                         # Parsed on first use; the publication year is the fallback
+                         # when the date is missing or malformed
+                         published=(data.get('firstPublicationDate'), data.get('pubYear')))
 
 class EuropePMCSearch:
-    def __init__(self, query, max_results=10):
+    # Largest page the Europe PMC REST API serves
+    PAGE_SIZE = 1000
+    # REST search endpoint (see daily_arxiv.configure_endpoints)
+    BASE_URL = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+
+    def __init__(self, query, max_results=10, since=None):
         self.query = query
         self.max_results = max_results
-        self.base_url = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+        # Only return records first published on or after this date (YYYY-MM-DD)
+        self.since = since
+        self.failed = False
+        # Set when max_results was reached while the cursor had more pages
+        self.truncated = False
+        self.base_url = self.BASE_URL
     
-    def results(self):
+    def _params(self):
         # Query: (original_query) AND (SRC:MED OR SRC:PPR)
         # We explicitly include MED (PubMed) and PPR (Preprints like bioRxiv, medRxiv)
         full_query = f"({self.query}) AND (SRC:MED OR SRC:PPR)"
+        if self.since:
+            full_query += f" AND (FIRST_PDATE:[{self.since} TO *])"
         
-        params = {
+        return {
             "query": full_query,
             "format": "json",
             "resultType": "core",
-            "pageSize": self.max_results,
-            "sort": "FIRST_PDATE_D" # Sort by date descending
+            "sort": "FIRST_PDATE_D", # Sort by date descending
+            "cursorMark": "*"
         }
+
+    @staticmethod
+    def _papers(result_list):
+        for result in result_list:
+            # Skip if it's likely an arXiv paper (we already fetch those via arxiv API)
+            # Europe PMC often lists arXiv papers under PPR. 
+            # We can check if the DOI contains 'arxiv' or if the bookOrReportDetails contains it.
+            if result.get('source') == 'PPR':
+                doi = result.get('doi', '').lower()
+                if 'arxiv' in doi:
+                    continue
+                # Also check if it has an arXiv ID field
+                if 'arxivId' in result:
+                    continue
+
+            yield EuropePMCPaper(result)
+
+    def results(self):
+        params = self._params()
+        fetched = 0
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            result_list = data.get("resultList", {}).get("result", [])
-            
-            for result in result_list:
-                # Skip if it's likely an arXiv paper (we already fetch those via arxiv API)
-                # Europe PMC often lists arXiv papers under PPR. 
-                # We can check if the DOI contains 'arxiv' or if the bookOrReportDetails contains it.
-                if result.get('source') == 'PPR':
-                    doi = result.get('doi', '').lower()
-                    if 'arxiv' in doi:
-                        continue
-                    # Also check if it has an arXiv ID field
-                    if 'arxivId' in result:
-                        continue
-
-                yield EuropePMCPaper(result)
+            # Page through the results with cursorMark until max_results records are read
+            while fetched < self.max_results:
+                params["pageSize"] = min(self.max_results - fetched, self.PAGE_SIZE)
+                response = http_client.get(self.base_url, source='europepmc', params=params)
+                response.raise_for_status()
+                data = response.json()
+                result_list = data.get("resultList", {}).get("result", [])
+                fetched += len(result_list)
+                yield from self._papers(result_list)
+
+                next_cursor = data.get("nextCursorMark")
+                if not result_list or not next_cursor or next_cursor == params["cursorMark"]:
+                    break
+                params["cursorMark"] = next_cursor
+            else:
+                # Stopped by max_results, not by the end of the cursor
+                self.truncated = True
                 
         except Exception as e:
+            self.failed = True
             logging.error(f"Europe PMC search failed: {e}")
-            return []
+
+    async def async_results(self, session):
+        """Same as results(), with the pages fetched by an http_client.AsyncSession."""
+        params = self._params()
+        fetched = 0
+        
+        try:
+            while fetched < self.max_results:
+                params["pageSize"] = min(self.max_results - fetched, self.PAGE_SIZE)
+                response = await session.get(self.base_url, source='europepmc', params=params)
+                response.raise_for_status()
+                data = response.json()
+                result_list = data.get("resultList", {}).get("result", [])
+                fetched += len(result_list)
+                for paper in self._papers(result_list):
+                    yield paper
+
+                next_cursor = data.get("nextCursorMark")
+                if not result_list or not next_cursor or next_cursor == params["cursorMark"]:
+                    break
+                params["cursorMark"] = next_cursor
+            else:
+                self.truncated = True
+                
+        except Exception as e:
+            self.failed = True
+            logging.error(f"Europe PMC search failed: {e}")
+
+class EuropePMCHarvester:
+    """
+    Incremental Europe PMC harvesting with per-query date windows.
+
+    Each query is searched only for records first published since its last
+    successful harvest (minus a few days of overlap for late indexing). The
+    date of every successful harvest is kept in a small JSON state file so
+    the next run only downloads the delta. Queries without a stored date
+    are backfilled from `backfill_from`. A harvest cut off by max_results
+    does not count as successful, so records older than the cut are not
+    skipped by the next window.
+    """
+
+    def __init__(self, state_path, backfill_from='2015-01-01', lookback_days=3,
+                 max_results=5000, backfill=False):
+        self.state_path = state_path
+        self.backfill_from = str(backfill_from)
+        self.lookback_days = lookback_days
+        self.max_results = max_results
+        self.state = {}
+        self._searches = []
+        self._lock = threading.Lock()
+        if not backfill and state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read Europe PMC harvest state {state_path}: {e}")
+
+    def since(self, query):
+        """Start of the date window to harvest for a query."""
+        last_run = self.state.get(query)
+        if not last_run:
+            return self.backfill_from
+        start = datetime.date.fromisoformat(last_run) - datetime.timedelta(days=self.lookback_days)
+        return max(start.isoformat(), self.backfill_from)
+
+    def search(self, query):
+        """Create an EuropePMCSearch limited to the query's date window."""
+        search = EuropePMCSearch(query=query, max_results=self.max_results,
+                                 since=self.since(query))
+        with self._lock:
+            self._searches.append(search)
+        return search
+
+    def commit(self, today=None):
+        """Record today's date for every query that was harvested completely."""
+        today = (today or datetime.date.today()).isoformat()
+        with self._lock:
+            for search in self._searches:
+                if search.truncated:
+                    logging.warning(f"Europe PMC harvest of '{search.query[:40]}' stopped at "
+                                    f"{search.max_results} records; its window since "
+                                    f"{search.since} is searched again next run (raise "
+                                    f"europepmc_harvest.max_results to complete it)")
+                elif not search.failed:
+                    self.state[search.query] = today
+            self._searches = []
+        with atomic_write(self.state_path) as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        logging.info(f"Europe PMC harvest state saved for {len(self.state)} queries")
@@ -0,0 +1,74 @@
+"""
+AI4Sarcopenia Literature Daily - Cache of rendered markdown fragments
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Keeps the rendered markdown of every topic section keyed by a hash of its
+content, render options and rendering code, so sections whose papers did not change are
+reused byte for byte instead of being sorted and formatted again.
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+from paper_store import atomic_write
+
+
+def fragment_key(*parts):
+    """SHA-256 of the JSON serialization of parts (content + render options)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FragmentCache:
+    """
+    JSON file of fragment key -> rendered text.
+
+    Only the fragments used during a run are written back by save(), so
+    sections of removed topics or outdated content drop out on their own.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: JSON file the fragments are loaded from and saved to;
+                None keeps them in memory for the current run only
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._fragments = dict()
+        self._used = dict()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding='utf-8') as f:
+                    self._fragments = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable fragment cache {path}: {e}")
+
+    def get(self, key):
+        """Return the cached fragment for key, or None."""
+        text = self._used.get(key)
+        if text is None:
+            text = self._fragments.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used[key] = text
+        return text
+
+    def set(self, key, text):
+        self._used[key] = text
+
+    def save(self):
+        """Write the fragments used in this run (unchanged files are not rewritten)."""
+        logging.info(f"Fragment cache: {self.hits} sections reused, {self.misses} rendered")
+        if not self.path:
+            return
+        with atomic_write(self.path) as f:
+            json.dump(self._used, f, ensure_ascii=False, sort_keys=True)
@@ -0,0 +1,182 @@
+"""
+AI4Sarcopenia Literature Daily - Batched GitHub code search
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Papers without a paperswithcode link are looked up on GitHub by title and
+by paper key. Instead of one repository search per paper and term, many
+terms are OR'ed into one query (the search API allows 256 characters and
+five operators) and the returned repositories are matched back to the terms
+locally. Searches are paced by the api.github.com token bucket of
+http_client, which follows the quota headers of the responses (10 searches
+per minute without a token, 30 with one), so a run never bursts into 403s.
+"""
+
+import os
+import logging
+
+import http_client
+from topic_matcher import tokenize
+
+MAX_QUERY_LENGTH = 256
+MAX_TERMS = 6          # five OR operators
+PER_PAGE = 100
+
+
+def _phrase(term):
+    """Quoted search phrase of a term, shortened to fit into one query."""
+    words = term.replace('"', ' ').split()
+    phrase = ''
+    for word in words:
+        if len(phrase) + len(word) + 3 > MAX_QUERY_LENGTH:
+            break
+        phrase = f"{phrase} {word}" if phrase else word
+    if not phrase and words:
+        phrase = words[0][:MAX_QUERY_LENGTH - 2]
+    return f'"{phrase}"'
+
+
+def _padded(tokens):
+    return f" {' '.join(tokens)} "
+
+
+class GitHubResolver:
+    """
+    Resolves search terms (titles, paper keys) to the most starred GitHub
+    repository whose name, description or topics contain the term.
+    """
+
+    def __init__(self, url, token=None, terms_per_query=MAX_TERMS, max_queries=None):
+        """
+        Args:
+            url: Repository search endpoint
+            token: Optional GitHub token (raises the search rate limit)
+            terms_per_query: Terms OR'ed into one search (at most 6)
+            max_queries: Optional maximum number of searches per run; terms
+                left over stay unanswered (and are retried by the next run)
+        """
+        self.url = url
+        self.token = token
+        self.terms_per_query = max(1, min(MAX_TERMS, terms_per_query))
+        self.max_queries = max_queries
+        self.queries = 0
+
+    def _search(self, query):
+        self.queries += 1
+        headers = {'Accept': 'application/vnd.github+json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        response = http_client.get(self.url, source='github', headers=headers,
+                                   params={'q': query, 'sort': 'stars', 'order': 'desc',
+                                           'per_page': PER_PAGE})
+        results = response.json()
+        if 'total_count' not in results:
+            raise ValueError(results.get('message', 'unexpected GitHub response'))
+        return results
+
+    def batches(self, terms):
+        """
+        Group terms into queries within the length and operator limits.
+
+        Args:
+            terms: Dictionary of key -> search term
+
+        Returns:
+            List of (query, {key: quoted phrase}) tuples
+        """
+        batches = []
+        query = ''
+        phrases = dict()
+        for key, term in terms.items():
+            phrase = _phrase(term)
+            candidate = f"{query} OR {phrase}" if query else phrase
+            if phrases and (len(phrases) >= self.terms_per_query
+                            or len(candidate) > MAX_QUERY_LENGTH):
+                batches.append((query, phrases))
+                query, phrases, candidate = '', dict(), phrase
+            query = candidate
+            phrases[key] = phrase
+        if phrases:
+            batches.append((query, phrases))
+        return batches
+
+    def _match(self, phrases, items):
+        """First (most starred) repository matching each phrase."""
+        texts = []
+        for item in items:
+            text = ' '.join([item.get('name') or '', item.get('description') or '']
+                            + list(item.get('topics') or []))
+            texts.append((_padded(tokenize(text)), item.get('html_url')))
+        found = dict()
+        for key, phrase in phrases.items():
+            needle = _padded(tokenize(phrase))
+            found[key] = next((url for text, url in texts if needle in text), None)
+        return found
+
+    def resolve(self, terms):
+        """
+        Look up many terms with as few searches as possible.
+
+        A batch whose results were truncated (more than one page of matches)
+        is searched again term by term for the terms it left unmatched. A
+        single-term search takes the most starred result, like a plain search.
+
+        Args:
+            terms: Dictionary of key -> search term
+
+        Returns:
+            Dictionary of key -> repository URL or None, for every term that
+            was answered; keys of failed or skipped searches are missing
+        """
+        answers = dict()
+        queue = self.batches(terms)
+        while queue:
+            query, phrases = queue.pop(0)
+            if self.max_queries is not None and self.queries >= self.max_queries:
+                skipped = sum(len(p) for _, p in queue) + len(phrases)
+                logging.warning(f"GitHub search budget of {self.max_queries} queries used up, "
+                                f"{skipped} terms left for the next run")
+                break
+            try:
+                results = self._search(query)
+            except Exception as e:
+                logging.warning(f"GitHub search failed for {len(phrases)} terms: {e}")
+                continue
+            items = results.get('items') or []
+            if len(phrases) == 1:
+                key = next(iter(phrases))
+                answers[key] = items[0]['html_url'] if results['total_count'] > 0 and items else None
+                continue
+            found = self._match(phrases, items)
+            truncated = results['total_count'] > len(items)
+            for key, url in found.items():
+                if url is not None or not truncated:
+                    answers[key] = url
+                else:
+                    queue.append((phrases[key], {key: phrases[key]}))
+        logging.info(f"GitHub search: {len(answers)} of {len(terms)} terms answered "
+                     f"with {self.queries} queries")
+        return answers
+
+
+def open_github_resolver(config, url):
+    """
+    Create the GitHubResolver described by the `github_search` config section.
+
+    The token is read from the environment variable named by `token_env`.
+
+    Returns:
+        GitHubResolver instance, or None if batched search is disabled
+    """
+    options = config.get('github_search') or {}
+    if not options.get('enabled'):
+        return None
+    token = os.environ.get(options.get('token_env') or 'GITHUB_TOKEN') or None
+    resolver = GitHubResolver(url, token=token,
+                              terms_per_query=options.get('terms_per_query', MAX_TERMS),
+                              max_queries=options.get('max_queries'))
+    logging.info(f"GitHub search: {'with' if token else 'without'} token, "
+                 f"{resolver.terms_per_query} terms per query")
+    return resolver
@@ -0,0 +1,475 @@
+"""
+AI4Sarcopenia Literature Daily - HTTP helpers shared by all paper sources
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+All paperswithcode, GitHub and Europe PMC requests go through one pooled
+requests.Session so connections are kept alive between calls. Transient
+failures (429, 5xx, connection errors) are retried with exponential backoff,
+honoring the server's Retry-After header.
+
+Every request of a scheduled session (the shared one and the arxiv
+package's) first takes a token from its host's bucket, so each host is
+sent requests no faster than configured. Remaining-quota and Retry-After
+headers slow the bucket down further until the quota resets, for all
+threads at once. AsyncSession sends requests the same way from an asyncio
+event loop (optional, needs httpx).
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextlib
+import email.utils
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # only needed by the asyncio engine (AsyncSession)
+    httpx = None
+
+import run_report
+
+# Maximum number of in-flight requests per host when topics are fetched
+# concurrently. arXiv asks for one request at a time, GitHub search is
+# heavily rate limited for unauthenticated clients.
+DEFAULT_HOST_LIMITS = {
+    "export.arxiv.org": 1,
+    "api.github.com": 2,
+    "arxiv.paperswithcode.com": 4,
+    "www.ebi.ac.uk": 4,
+}
+DEFAULT_HOST_LIMIT = 4
+
+# Token buckets per host: requests per second and requests allowed back to
+# back. arXiv asks for one request every three seconds; GitHub search allows
+# 30 requests per minute with a token (10 without, learned from its quota
+# headers). Hosts without a bucket are only limited by their concurrency.
+DEFAULT_RATE_LIMITS = {
+    "export.arxiv.org": {"rate": 1 / 3, "burst": 1},
+    "api.github.com": {"rate": 0.5, "burst": 1},
+    "arxiv.paperswithcode.com": {"rate": 10, "burst": 10},
+    "www.ebi.ac.uk": {"rate": 10, "burst": 10},
+}
+
+# Request timeout in seconds for each source
+DEFAULT_TIMEOUTS = {
+    "paperswithcode": 10,
+    "github": 10,
+    "europepmc": 30,
+}
+DEFAULT_TIMEOUT = 20
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_host_limits = dict(DEFAULT_HOST_LIMITS)
+_default_limit = DEFAULT_HOST_LIMIT
+_semaphores = {}
+_rate_limits = dict(DEFAULT_RATE_LIMITS)
+_buckets = {}
+_lock = threading.Lock()
+
+_timeouts = dict(DEFAULT_TIMEOUTS)
+_retries = 3
+_backoff_factor = 1.0
+_max_backoff = 60.0
+_session = None
+
+
+def configure_host_limits(limits=None, default=DEFAULT_HOST_LIMIT):
+    """
+    Set the per-host concurrency limits used by host_slot().
+
+    Args:
+        limits: Mapping of host name to maximum concurrent requests
+        default: Limit used for hosts not listed in limits
+    """
+    global _default_limit
+    with _lock:
+        _host_limits.clear()
+        _host_limits.update(DEFAULT_HOST_LIMITS)
+        _host_limits.update(limits or {})
+        _default_limit = default
+        _semaphores.clear()
+
+
+def configure_rate_limits(limits=None):
+    """
+    Set the per-host token buckets of the request scheduler.
+
+    Args:
+        limits: Mapping of host name to {'rate': requests per second,
+            'burst': requests allowed back to back}; a host mapped to None
+            gets no bucket
+    """
+    with _lock:
+        _rate_limits.clear()
+        _rate_limits.update(DEFAULT_RATE_LIMITS)
+        _rate_limits.update(limits or {})
+        _buckets.clear()
+
+
+def configure_http(options=None):
+    """
+    Apply the `http` section of config.yaml (retries, backoff, timeouts).
+
+    Args:
+        options: Mapping with optional keys retries, backoff_factor,
+            max_backoff and timeouts (source name -> seconds)
+    """
+    global _retries, _backoff_factor, _max_backoff
+    options = options or {}
+    with _lock:
+        _retries = int(options.get('retries', 3))
+        _backoff_factor = float(options.get('backoff_factor', 1.0))
+        _max_backoff = float(options.get('max_backoff', 60))
+        _timeouts.clear()
+        _timeouts.update(DEFAULT_TIMEOUTS)
+        _timeouts.update(options.get('timeouts') or {})
+
+
+def _semaphore_for(host):
+    with _lock:
+        sem = _semaphores.get(host)
+        if sem is None:
+            limit = max(1, int(_host_limits.get(host, _default_limit)))
+            sem = threading.BoundedSemaphore(limit)
+            _semaphores[host] = sem
+        return sem
+
+
+@contextlib.contextmanager
+def host_slot(url):
+    """
+    Hold one of the concurrency slots of the host serving url.
+
+    Args:
+        url: Request URL (or bare host name)
+    """
+    host = urlsplit(url).hostname or url
+    sem = _semaphore_for(host)
+    with sem:
+        yield
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket of one host.
+
+    Tokens are handed out in the order they are asked for: a request that
+    finds the bucket empty reserves the next token and sleeps until it is
+    due, so waiting threads form a queue instead of racing.
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate: Tokens (requests) per second
+            burst: Bucket size, i.e. requests allowed back to back
+        """
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._next = 0.0            # time the bucket is full again, minus one interval
+        self._paused_until = 0.0
+        self._quota_interval = 0.0
+        self._quota_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available.
+
+        Returns:
+            Seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self):
+        """
+        Reserve the next token without waiting for it.
+
+        Returns:
+            Seconds until the token is due (0 if it is available now)
+        """
+        with self._lock:
+            now = time.monotonic()
+            interval, burst = self.interval, self.burst
+            # A server-announced quota is spread evenly, without bursts
+            if now < self._quota_until:
+                interval, burst = max(interval, self._quota_interval), 1
+            start = max(now, self._paused_until, self._next - (burst - 1) * interval)
+            self._next = max(self._next, start) + interval
+        return start - now
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next seconds (Retry-After, exhausted quota)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def limit_quota(self, remaining, reset_in):
+        """Spread the remaining requests of a quota window over the time until its reset."""
+        with self._lock:
+            now = time.monotonic()
+            if remaining <= 0:
+                self._paused_until = max(self._paused_until, now + reset_in)
+            else:
+                self._quota_interval = reset_in / remaining
+                self._quota_until = now + reset_in
+
+
+def _bucket_for(url):
+    host = urlsplit(url).hostname or url
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            options = _rate_limits.get(host)
+            if not options or not options.get('rate'):
+                return None
+            bucket = TokenBucket(float(options['rate']), int(options.get('burst', 1)))
+            _buckets[host] = bucket
+        return bucket
+
+
+def _quota(response):
+    """Remaining requests and seconds until the quota resets, from the rate-limit headers."""
+    headers = response.headers
+    remaining = headers.get("X-RateLimit-Remaining", headers.get("RateLimit-Remaining"))
+    reset = headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+    if not (remaining and remaining.isdigit() and reset and reset.isdigit()):
+        return None
+    reset = int(reset)
+    # GitHub sends the reset as a Unix time, the IETF draft header in seconds
+    if reset > 10 ** 9:
+        reset -= time.time()
+    return int(remaining), max(0.0, reset)
+
+
+def _feedback(bucket, response):
+    """Slow a bucket down according to the quota and Retry-After headers of a response."""
+    quota = _quota(response)
+    if quota is not None:
+        remaining, reset_in = quota
+        if remaining == 0:
+            reset_in = min(reset_in, _max_backoff)
+        bucket.limit_quota(remaining, reset_in)
+    if _should_retry(response):
+        delay = _retry_after(response)
+        if delay:
+            bucket.pause(min(delay, _max_backoff))
+
+
+class ScheduledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that takes a token of the host's bucket before every request
+    and feeds the quota headers of the response back into the bucket.
+    """
+
+    def send(self, request, **kwargs):
+        bucket = _bucket_for(request.url)
+        if bucket is None:
+            return super().send(request, **kwargs)
+        waited = bucket.acquire()
+        if waited > 0:
+            run_report.current().record_wait(request.url, waited)
+        response = super().send(request, **kwargs)
+        # requests counts the wait into response.elapsed; the report does not
+        response.rate_limit_wait = waited
+        _feedback(bucket, response)
+        return response
+
+
+def schedule_session(session, pool_size=DEFAULT_HOST_LIMIT, pool_connections=10):
+    """
+    Route the requests of a session through the request scheduler and
+    record them in the run report.
+
+    Args:
+        session: requests.Session (the shared one, or a library's own)
+        pool_size: Connections kept alive per host
+        pool_connections: Number of hosts with pooled connections
+    """
+    adapter = ScheduledAdapter(pool_connections=pool_connections, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(run_report.response_hook)
+    return session
+
+
+def get_session():
+    """Return the shared, connection-pooling requests.Session."""
+    global _session
+    with _lock:
+        if _session is None:
+            pool_size = max([DEFAULT_HOST_LIMIT] + list(_host_limits.values()))
+            session = requests.Session()
+            session.headers["User-Agent"] = "AI4SarcopeniaLiteratureDaily"
+            _session = schedule_session(session, pool_size=pool_size,
+                                        pool_connections=len(_host_limits) + 1)
+        return _session
+
+
+def _retry_after(response):
+    """Seconds to wait according to a Retry-After or rate-limit reset header."""
+    value = response.headers.get("Retry-After")
+    if value:
+        if value.isdigit():
+            return float(value)
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    # GitHub signals an exhausted quota with 403/429 and X-RateLimit-Reset
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset and reset.isdigit():
+            return max(0.0, int(reset) - time.time())
+    return None
+
+
+def _should_retry(response):
+    if response.status_code in RETRY_STATUSES:
+        return True
+    return (response.status_code == 403
+            and response.headers.get("X-RateLimit-Remaining") == "0")
+
+
+def get(url, source=None, params=None, **kwargs):
+    """
+    Send a GET request through the shared session.
+
+    Retries connection errors, timeouts, 429 and 5xx responses with
+    exponential backoff. The host's concurrency slot is released while
+    waiting between attempts.
+
+    Args:
+        url: Request URL
+        source: Source name used to pick the timeout (e.g. 'github')
+        params: Query parameters
+        **kwargs: Extra arguments for requests.Session.get
+
+    Returns:
+        requests.Response of the last attempt
+
+    Raises:
+        requests.RequestException if the last attempt failed to connect
+    """
+    kwargs.setdefault("timeout", _timeouts.get(source, DEFAULT_TIMEOUT))
+    session = get_session()
+    attempt = 0
+    while True:
+        try:
+            with host_slot(url):
+                response = session.get(url, params=params, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            run_report.current().record_error(url)
+            if attempt >= _retries:
+                raise
+            delay = None
+            reason = str(e)
+        else:
+            if attempt >= _retries or not _should_retry(response):
+                return response
+            delay = _retry_after(response)
+            reason = f"HTTP {response.status_code}"
+
+        attempt += 1
+        time.sleep(_retry_delay(url, source, reason, attempt, delay))
+
+
+def _retry_delay(url, source, reason, attempt, delay=None):
+    """Seconds before retry number attempt (exponential backoff unless the server said)."""
+    if delay is None:
+        delay = _backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, _backoff_factor)
+    delay = min(delay, _max_backoff)
+    run_report.current().record_retry(url)
+    logging.warning(f"{source or urlsplit(url).hostname}: {reason}, "
+                    f"retry {attempt}/{_retries} in {delay:.1f}s")
+    return delay
+
+
+class AsyncSession:
+    """
+    asyncio counterpart of get(), sending requests with an httpx.AsyncClient.
+
+    Requests share the host limits, token buckets, retries and run report
+    of the synchronous session. Host slots are asyncio semaphores, so a
+    request waiting for its host costs no thread. Create and use it on one
+    event loop.
+    """
+
+    def __init__(self):
+        if httpx is None:
+            raise RuntimeError("The asyncio engine needs httpx (pip install httpx)")
+        with _lock:
+            connections = sum(_host_limits.values()) + _default_limit
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": "AI4SarcopeniaLiteratureDaily"},
+            limits=httpx.Limits(max_connections=connections),
+            follow_redirects=True)
+        self._slots = {}
+
+    def _slot(self, url):
+        host = urlsplit(url).hostname or url
+        slot = self._slots.get(host)
+        if slot is None:
+            with _lock:
+                limit = max(1, int(_host_limits.get(host, _default_limit)))
+            slot = asyncio.Semaphore(limit)
+            self._slots[host] = slot
+        return slot
+
+    async def get(self, url, source=None, params=None, **kwargs):
+        """
+        Send a GET request; same retries and arguments as get().
+
+        Returns:
+            httpx.Response of the last attempt
+
+        Raises:
+            httpx.TransportError if the last attempt failed to connect
+        """
+        kwargs.setdefault("timeout", _timeouts.get(source, DEFAULT_TIMEOUT))
+        bucket = _bucket_for(url)
+        attempt = 0
+        while True:
+            async with self._slot(url):
+                if bucket is not None:
+                    wait = bucket.reserve()
+                    if wait > 0:
+                        run_report.current().record_wait(url, wait)
+                        await asyncio.sleep(wait)
+                start = time.monotonic()
+                try:
+                    response = await self._client.get(url, params=params, **kwargs)
+                except httpx.TransportError as e:
+                    run_report.current().record_error(url)
+                    if attempt >= _retries:
+                        raise
+                    delay = None
+                    reason = str(e) or type(e).__name__
+                else:
+                    run_report.current().record_request(str(response.url), time.monotonic() - start,
+                                                        response.status_code, len(response.content))
+                    if bucket is not None:
+                        _feedback(bucket, response)
+                    if attempt >= _retries or not _should_retry(response):
+                        return response
+                    delay = _retry_after(response)
+                    reason = f"HTTP {response.status_code}"
+
+            attempt += 1
+            await asyncio.sleep(_retry_delay(url, source, reason, attempt, delay))
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,286 @@
+"""
+AI4Sarcopenia Literature Daily - SQLite paper store
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Optional system of record for the paper archive. Papers, topics and the
+paper-topic membership live in indexed SQLite tables, so upserts, "missing
+code link" scans and per-topic reads are queries instead of full JSON
+loads. The JSON files in docs/ are exported from it after every run.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+
+from paper_store import FIELDS, load_papers
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS papers ("
+    " id TEXT PRIMARY KEY,"
+    " date TEXT NOT NULL,"
+    " title TEXT NOT NULL,"
+    " first_author TEXT,"
+    " url TEXT,"
+    " code_url TEXT,"
+    " source TEXT,"
+    " comment TEXT,"
+    " abstract TEXT,"
+    " alt_url TEXT)",
+    "CREATE TABLE IF NOT EXISTS topics ("
+    " id INTEGER PRIMARY KEY,"
+    " name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS paper_topics ("
+    " topic_id INTEGER NOT NULL REFERENCES topics(id),"
+    " paper_id TEXT NOT NULL REFERENCES papers(id),"
+    " PRIMARY KEY (topic_id, paper_id))",
+    "CREATE INDEX IF NOT EXISTS idx_paper_topics_paper ON paper_topics(paper_id)",
+    "CREATE INDEX IF NOT EXISTS idx_papers_date ON papers(date)",
+    "CREATE INDEX IF NOT EXISTS idx_papers_source ON papers(source, date)",
+    # Partial index: the link refresh only ever scans papers without code
+    "CREATE INDEX IF NOT EXISTS idx_papers_missing_code ON papers(source, date, id)"
+    " WHERE code_url IS NULL",
+)
+
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5("
+    " title, abstract, content='papers', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN"
+    " INSERT INTO papers_fts(rowid, title, abstract) VALUES (new.rowid, new.title, new.abstract);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN"
+    " INSERT INTO papers_fts(papers_fts, rowid, title, abstract)"
+    " VALUES ('delete', old.rowid, old.title, old.abstract);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstract ON papers BEGIN"
+    " INSERT INTO papers_fts(papers_fts, rowid, title, abstract)"
+    " VALUES ('delete', old.rowid, old.title, old.abstract);"
+    " INSERT INTO papers_fts(rowid, title, abstract) VALUES (new.rowid, new.title, new.abstract);"
+    " END",
+)
+
+_COLUMNS = ', '.join(FIELDS)
+# A stored code link, abstract or alternate link is kept when an update
+# comes without one (failed lookup, legacy record)
+_KEEP = ('code_url', 'abstract', 'alt_url')
+_UPSERT = (
+    f"INSERT INTO papers ({_COLUMNS}) VALUES ({', '.join('?' for _ in FIELDS)}) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    + ', '.join(f"{f} = excluded.{f}" if f not in _KEEP else f"{f} = COALESCE(excluded.{f}, papers.{f})"
+                for f in FIELDS if f != 'id')
+)
+
+
+class PaperDB:
+    """
+    SQLite store of paper records (see paper_store.FIELDS) and their topics.
+
+    Full-text search over title and abstract uses an FTS5 index when the
+    SQLite library supports it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(papers)")]
+        for field in FIELDS:
+            if field not in columns:
+                self._conn.execute(f"ALTER TABLE papers ADD COLUMN {field} TEXT")
+        try:
+            for statement in _FTS_SCHEMA:
+                self._conn.execute(statement)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Full-text search disabled for {path}: {e}")
+            self.has_fts = False
+        self._conn.commit()
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM papers LIMIT 1").fetchone() is None
+
+    def _topic_id(self, name):
+        self._conn.execute("INSERT OR IGNORE INTO topics (name) VALUES (?)", (name,))
+        return self._conn.execute("SELECT id FROM topics WHERE name = ?", (name,)).fetchone()[0]
+
+    def upsert(self, data):
+        """
+        Insert or update papers and their topic membership in one transaction.
+
+        Args:
+            data: Dictionary topic -> {paper key: record}, or a list of them
+                (as returned by get_all_daily_papers)
+
+        Returns:
+            Number of records written
+        """
+        batches = data if isinstance(data, list) else [data]
+        count = 0
+        with self._lock, self._conn:
+            for batch in batches:
+                for topic, papers in batch.items():
+                    topic_id = self._topic_id(topic)
+                    for paper_key, record in papers.items():
+                        if record is None:
+                            continue
+                        values = [record.get(f) or None for f in FIELDS]
+                        values[0] = paper_key
+                        self._conn.execute(_UPSERT, values)
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO paper_topics (topic_id, paper_id) VALUES (?, ?)",
+                            (topic_id, paper_key))
+                        count += 1
+        return count
+
+    def import_json(self, filename):
+        """Load a JSON store into the database; returns the number of records."""
+        count = self.upsert(load_papers(filename))
+        logging.info(f"Imported {count} records from {filename} into {self.path}")
+        return count
+
+    def known_papers(self):
+        """
+        Stored papers per topic, for incremental runs.
+
+        Returns:
+            Dictionary of topic -> {paper key: stored date string}
+        """
+        known = dict()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.name, p.id, p.date FROM paper_topics pt"
+                " JOIN topics t ON t.id = pt.topic_id"
+                " JOIN papers p ON p.id = pt.paper_id")
+            for topic, paper_key, date in rows:
+                known.setdefault(topic, {})[paper_key] = date
+        return known
+
+    def missing_code_links(self, source='arxiv', limit=None):
+        """
+        Keys of papers without a code link, most recent first.
+
+        Args:
+            source: Only papers of this source
+            limit: Optional maximum number of keys
+        """
+        sql = ("SELECT id FROM papers WHERE code_url IS NULL AND source = ?"
+               " ORDER BY date DESC, id DESC")
+        params = [source]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def set_code_links(self, links):
+        """Store found code links (paper key -> repository URL)."""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE papers SET code_url = ? WHERE id = ?",
+                                   [(url, paper_key) for paper_key, url in links.items()])
+
+    def source_papers(self, source):
+        """
+        Records of one source, most recent first.
+
+        Returns:
+            Dictionary of paper key -> record
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM papers WHERE source = ?"
+                " ORDER BY date DESC, id DESC", (source,)).fetchall()
+        return {row[0]: dict(zip(FIELDS, row)) for row in rows}
+
+    def set_metadata(self, records):
+        """Store refreshed dates, titles, comments and abstracts of records."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE papers SET date = ?, title = ?, comment = ?, abstract = ? WHERE id = ?",
+                [(r['date'], r['title'], r['comment'], r['abstract'], r['id']) for r in records])
+
+    def topic_papers(self, topic):
+        """
+        Records of one topic, newest first.
+
+        Returns:
+            Dictionary of paper key -> record
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join('p.' + f for f in FIELDS)} FROM paper_topics pt"
+                " JOIN topics t ON t.id = pt.topic_id"
+                " JOIN papers p ON p.id = pt.paper_id"
+                " WHERE t.name = ? ORDER BY p.date DESC, p.id DESC", (topic,)).fetchall()
+        return {row[0]: dict(zip(FIELDS, row)) for row in rows}
+
+    def export(self):
+        """
+        The whole archive in the JSON store layout.
+
+        Topics keep the order in which they were first stored.
+
+        Returns:
+            Dictionary of topic -> {paper key: record}
+        """
+        with self._lock:
+            topics = [row[0] for row in self._conn.execute("SELECT name FROM topics ORDER BY id")]
+        return {topic: self.topic_papers(topic) for topic in topics}
+
+    def search(self, query, limit=50):
+        """
+        Full-text search over titles and abstracts (FTS5 query syntax).
+
+        Returns:
+            List of records, best matches first
+        """
+        if not self.has_fts:
+            raise RuntimeError("SQLite was built without FTS5")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join('p.' + f for f in FIELDS)} FROM papers_fts"
+                " JOIN papers p ON p.rowid = papers_fts.rowid"
+                " WHERE papers_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit)).fetchall()
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_paper_db(config, seed_files=()):
+    """
+    Open the paper database described by the `paper_db` config section.
+
+    A new (or lost) database is seeded from the exported JSON files, so the
+    committed exports are enough to rebuild it.
+
+    Args:
+        config: Configuration dictionary
+        seed_files: JSON files imported when the database is empty
+
+    Returns:
+        PaperDB instance, or None if the database is disabled
+    """
+    options = config.get('paper_db') or {}
+    if not options.get('enabled') or not options.get('path'):
+        return None
+    try:
+        db = PaperDB(options['path'])
+    except sqlite3.Error as e:
+        logging.warning(f"Could not open paper database {options['path']}: {e}")
+        return None
+    if db.is_empty():
+        for filename in seed_files:
+            db.import_json(filename)
+    return db
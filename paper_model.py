@@ -0,0 +1,127 @@
+"""
+AI4Sarcopenia Literature Daily - Compact search result model
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Search results of every source are converted right after they are read
+into a small __slots__ object holding only the fields the pipeline uses.
+The raw API payloads (arxiv.Result, Europe PMC `core` records) are not
+kept, and dates are parsed the first time they are needed.
+"""
+
+import datetime
+
+_DATE_FORMATS = ('%Y-%m-%d', '%Y')
+
+
+def parse_date(value):
+    """
+    Convert a date value to a naive UTC datetime.
+
+    Args:
+        value: datetime (aware or naive), 'YYYY-MM-DD' or 'YYYY' string, or
+            a tuple of such values tried in order (the first one that
+            parses is used)
+
+    Returns:
+        datetime; the current time if value is missing or unparsable
+    """
+    for candidate in (value if isinstance(value, tuple) else (value,)):
+        if isinstance(candidate, datetime.datetime):
+            if candidate.tzinfo is not None:
+                candidate = candidate.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            return candidate
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(str(candidate), fmt)
+            except (TypeError, ValueError):
+                continue
+    return datetime.datetime.now()
+
+
+class Paper:
+    """
+    Search result of any source.
+
+    `published` and `updated` are naive UTC datetimes, so results of all
+    sources can be compared and merged; `updated` falls back to `published`.
+    """
+
+    __slots__ = ('source', 'paper_id', 'title', 'summary', 'authors', 'doi',
+                 'entry_id', 'comment', '_published', '_updated')
+
+    def __init__(self, source, paper_id, title, summary='', authors=(), doi=None,
+                 entry_id=None, comment=None, published=None, updated=None):
+        """
+        Args:
+            source: 'arxiv' or the Europe PMC source ('MED', 'PPR')
+            paper_id: Source ID (arXiv ID with version, PMID, PPR ID)
+            title: Paper title
+            summary: Abstract
+            authors: Author names, first author first
+            doi: DOI, None if unknown
+            entry_id: Landing page URL
+            comment: Free-text comment
+            published: Publication date (datetime, date string or tuple of
+                fallbacks, see parse_date; parsed lazily)
+            updated: Last updated date, None if the same as published
+        """
+        self.source = source
+        self.paper_id = paper_id
+        self.title = title
+        self.summary = summary or ''
+        self.authors = list(authors)
+        self.doi = doi
+        self.entry_id = entry_id
+        self.comment = comment
+        self._published = published
+        self._updated = updated
+
+    @property
+    def published(self):
+        if not isinstance(self._published, datetime.datetime) or self._published.tzinfo:
+            self._published = parse_date(self._published)
+        return self._published
+
+    @property
+    def updated(self):
+        if self._updated is None:
+            return self.published
+        if not isinstance(self._updated, datetime.datetime) or self._updated.tzinfo:
+            self._updated = parse_date(self._updated)
+        return self._updated
+
+    def get_short_id(self):
+        return self.paper_id
+
+    def to_dict(self):
+        """JSON-serializable fields of the paper (dates as ISO strings)."""
+        return {'source': self.source, 'paper_id': self.paper_id, 'title': self.title,
+                'summary': self.summary, 'authors': self.authors, 'doi': self.doi,
+                'entry_id': self.entry_id, 'comment': self.comment,
+                'published': self.published.isoformat(),
+                'updated': self.updated.isoformat()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Paper from the output of to_dict()."""
+        return cls(data['source'], data['paper_id'], data['title'],
+                   summary=data.get('summary'), authors=data.get('authors') or (),
+                   doi=data.get('doi'), entry_id=data.get('entry_id'),
+                   comment=data.get('comment'),
+                   published=datetime.datetime.fromisoformat(data['published']),
+                   updated=datetime.datetime.fromisoformat(data['updated']))
+
+    @classmethod
+    def from_arxiv(cls, result):
+        """Build a Paper from an arxiv.Result (which is not kept)."""
+        return cls('arxiv', result.get_short_id(), result.title,
+                   summary=result.summary,
+                   authors=[str(author) for author in result.authors],
+                   doi=result.doi,
+                   entry_id=result.entry_id,
+                   comment=result.comment,
+                   published=result.published,
+                   updated=result.updated)
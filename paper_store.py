@@ -0,0 +1,216 @@
+"""
+AI4Sarcopenia Literature Daily - Structured paper records and JSON store
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+The JSON files in docs/ map topic -> paper key -> record, where a record is
+a plain dict with the fields in FIELDS. Markdown is rendered from the
+records only when README.md / docs/index.md are written.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+import contextlib
+
+FIELDS = ('id', 'date', 'title', 'first_author', 'url', 'code_url', 'source', 'comment',
+          'abstract', 'alt_url')
+
+# Legacy entry: |**date**|**title**|author et.al.|[id](url)|**[link](repo)**|
+_LEGACY_ROW = re.compile(
+    r"^\|\*\*(?P<date>[^*|]*)\*\*\|\*\*(?P<title>.*)\*\*\|(?P<first_author>.*?) et\.al\.\|"
+    r"\[(?P<id>[^\]]*)\]\((?P<url>[^)]*)\)\|(?P<code>.*)\|\s*$", re.S)
+_CODE_LINK = re.compile(r"\[link\]\(([^)]*)\)")
+
+
+def new_record(paper_id, date, title, first_author, url,
+               code_url=None, source='arxiv', comment=None, abstract=None, alt_url=None):
+    """
+    Build a paper record.
+
+    Args:
+        paper_id: Paper key (arXiv ID without version, PMID or PPR ID)
+        date: Last updated date, YYYY-MM-DD
+        title: Paper title
+        first_author: Name of the first author
+        url: Paper URL
+        code_url: Code repository URL, None if unknown
+        source: 'arxiv' or the Europe PMC source ('MED', 'PPR')
+        comment: Free-text comment (arXiv comment, Europe PMC source note)
+        abstract: Paper abstract, None if unknown (legacy entries)
+        alt_url: URL of the same work in another source (e.g. the PubMed
+            record of an arXiv preprint), None if there is none
+
+    Returns:
+        Record dictionary
+    """
+    return {
+        'id': paper_id,
+        'date': str(date),
+        'title': title,
+        'first_author': first_author,
+        'url': url,
+        'code_url': code_url,
+        'source': source,
+        'comment': comment,
+        'abstract': abstract,
+        'alt_url': alt_url,
+    }
+
+
+def guess_source(paper_id, url):
+    """Infer the source of a legacy entry from its key and URL."""
+    if 'arxiv.org' in url:
+        return 'arxiv'
+    match = re.search(r"europepmc\.org/article/([A-Z]+)/", url)
+    if match:
+        return match.group(1)
+    return 'PPR' if paper_id.startswith('PPR') else 'MED'
+
+
+def parse_legacy_row(paper_id, row):
+    """
+    Convert a pre-rendered markdown table row into a record.
+
+    Returns:
+        Record dictionary, or None if the row cannot be parsed
+    """
+    match = _LEGACY_ROW.match(str(row))
+    if match is None:
+        return None
+    code = _CODE_LINK.search(match.group('code'))
+    url = match.group('url')
+    return new_record(paper_id,
+                      date=match.group('date'),
+                      title=match.group('title'),
+                      first_author=match.group('first_author'),
+                      url=url,
+                      code_url=code.group(1) if code else None,
+                      source=guess_source(paper_id, url))
+
+
+def migrate_papers(data):
+    """
+    Convert every legacy string entry of a loaded store into a record, in place.
+
+    Returns:
+        Number of converted entries
+    """
+    converted = 0
+    for topic, papers in data.items():
+        for paper_id, entry in list(papers.items()):
+            if isinstance(entry, dict):
+                continue
+            record = parse_legacy_row(paper_id, entry)
+            if record is None:
+                logging.warning(f"Dropping unparsable entry {paper_id} in {topic}: {entry!r}")
+                del papers[paper_id]
+                continue
+            papers[paper_id] = record
+            converted += 1
+    return converted
+
+
+def load_papers(filename):
+    """
+    Load a JSON store; legacy markdown entries are converted on the fly.
+
+    Returns:
+        Dictionary of topic -> {paper key: record} ({} if the file is missing or empty)
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r", encoding='utf-8') as f:
+        content = f.read()
+    data = json.loads(content) if content else {}
+    migrate_papers(data)
+    return data
+
+
+def file_digest(filename):
+    """SHA-256 of a file's content, or None if it does not exist."""
+    if not os.path.exists(filename):
+        return None
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def atomic_write(filename):
+    """
+    Open a text file whose content replaces filename when the block exits.
+
+    The content is written to a temporary file in the same directory and
+    moved over filename with os.replace, so readers never see a partial
+    file, even if the process is killed mid-write. If the new content is
+    byte-for-byte identical to the existing file, the file is left
+    untouched (no new mtime, no commit churn).
+
+    Args:
+        filename: Destination file path
+    """
+    directory = os.path.dirname(filename) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding='utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if file_digest(tmp_path) == file_digest(filename):
+            os.remove(tmp_path)
+            logging.info(f"{filename} unchanged, not rewritten")
+            return
+        if os.path.exists(filename):
+            mode = os.stat(filename).st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_papers(filename, data):
+    """
+    Write a JSON store atomically, only if its content changed.
+
+    The JSON text is streamed to disk chunk by chunk instead of being built
+    as one string in memory.
+    """
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    with atomic_write(filename) as f:
+        for chunk in encoder.iterencode(data):
+            f.write(chunk)
+
+
+def migrate_json_file(filename):
+    """
+    One-time migration of a JSON store from markdown rows to records.
+
+    Returns:
+        Number of converted entries
+    """
+    if not os.path.exists(filename):
+        return 0
+    with open(filename, "r", encoding='utf-8') as f:
+        content = f.read()
+    data = json.loads(content) if content else {}
+    converted = migrate_papers(data)
+    if converted:
+        save_papers(filename, data)
+    logging.info(f"Migrated {converted} entries in {filename}")
+    return converted
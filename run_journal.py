@@ -0,0 +1,181 @@
+"""
+AI4Sarcopenia Literature Daily - Checkpoint journal for resumable runs
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+A run appends its progress to a JSON-lines file as it goes: the results
+of every search query once its stream is complete, every enriched paper
+record, every code link found by the link refresh, and the final papers of
+each topic once all topics are fetched. Nothing else is written before the
+JSON files are updated at the very end, so after a timeout or a stalled
+source `--resume` replays the journal and only does the work that is left:
+completed searches are not sent again, only the ones that were still
+running. A run that finishes marks its journal as done; the next run
+without --resume starts a new one.
+
+Entries (one JSON object per line):
+    {"event": "start", "mode": "daily" | "links", "started": ISO time}
+    {"event": "search", "query": query, "results": [Paper.to_dict()]}
+    {"event": "record", "key": paper key, "record": paper record}
+    {"event": "link", "key": paper key, "code_url": URL}
+    {"event": "topic", "topic": name, "papers": {paper key: record}}
+    {"event": "done"}
+"""
+
+import os
+import json
+import logging
+import datetime
+import threading
+
+from paper_model import Paper
+
+
+class RunJournal:
+    """
+    Append-only JSON-lines journal of one run.
+
+    The entries replayed from an interrupted run are available as
+    `searches`, `records`, `links` and `topics`; new entries are added to
+    them as well.
+    """
+
+    def __init__(self, path, mode, resume=False):
+        """
+        Args:
+            path: Journal file
+            mode: 'daily' (fetch new papers) or 'links' (refresh links)
+            resume: Replay the journal if it belongs to an unfinished run
+                of the same mode; otherwise a new journal is started
+        """
+        self.path = path
+        self.mode = mode
+        self.searches = dict()    # query -> [Paper] of a completed search
+        self.records = dict()     # paper key -> enriched record
+        self.links = dict()       # paper key -> code link found
+        self.topics = dict()      # topic -> {paper key: record}
+        self._lock = threading.Lock()
+
+        resumed = resume and self._replay()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if resumed else 'w', encoding='utf-8')
+        if resumed:
+            logging.info(f"Resuming run from {path}: {len(self.topics)} topics, "
+                         f"{len(self.searches)} searches, {len(self.records)} records, "
+                         f"{len(self.links)} links")
+        else:
+            self._write({'event': 'start', 'mode': mode,
+                         'started': datetime.datetime.now(datetime.timezone.utc)
+                         .isoformat(timespec='seconds')})
+
+    def _replay(self):
+        """Load the entries of an unfinished run; False if there is none to resume."""
+        if not os.path.exists(self.path):
+            logging.info(f"No run journal at {self.path}, starting a new run")
+            return False
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # The last line of a killed run may be cut off
+                    logging.warning(f"Skipping unreadable run journal line: {line[:80]!r}")
+        if not entries or entries[0].get('event') != 'start':
+            logging.warning(f"Run journal {self.path} has no start entry, starting a new run")
+            return False
+        if entries[0].get('mode') != self.mode:
+            logging.info(f"Run journal {self.path} belongs to a '{entries[0].get('mode')}' run, "
+                         f"starting a new run")
+            return False
+        if entries[-1].get('event') == 'done':
+            logging.info(f"Run of {entries[0].get('started')} finished, starting a new run")
+            return False
+        for entry in entries:
+            event = entry.get('event')
+            if event == 'search':
+                self.searches[entry['query']] = [Paper.from_dict(paper)
+                                                 for paper in entry['results']]
+            elif event == 'record':
+                self.records[entry['key']] = entry['record']
+            elif event == 'link':
+                self.links[entry['key']] = entry['code_url']
+            elif event == 'topic':
+                self.topics[entry['topic']] = entry['papers']
+        return True
+
+    def _write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            # Flushed per entry so a killed run loses at most the line in progress
+            self._file.flush()
+
+    def search(self, query, papers):
+        """Journal the results of a search query whose stream is complete."""
+        self.searches[query] = papers
+        self._write({'event': 'search', 'query': query,
+                     'results': [paper.to_dict() for paper in papers]})
+
+    def record(self, paper_key, record):
+        """
+        Journal the enriched record of a paper.
+
+        A resumed run only reuses records with a code link; the others are
+        looked up again (through the enrichment cache), since a failed
+        lookup also leaves code_url empty.
+        """
+        self.records[paper_key] = record
+        self._write({'event': 'record', 'key': paper_key, 'record': record})
+
+    def link(self, paper_key, code_url):
+        """
+        Journal a code link found by the link refresh.
+
+        "No code" answers are not journaled: they cannot be told apart from
+        failed lookups, which a resumed run should retry. The enrichment
+        cache keeps the real negative answers.
+        """
+        self.links[paper_key] = code_url
+        self._write({'event': 'link', 'key': paper_key, 'code_url': code_url})
+
+    def topic(self, topic, papers):
+        """Journal the final papers of a topic, once all topics are fetched."""
+        self.topics[topic] = papers
+        self._write({'event': 'topic', 'topic': topic, 'papers': papers})
+
+    def done(self):
+        """Mark the run as finished; it is not resumed again."""
+        self._write({'event': 'done'})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def open_journal(config, resume=False):
+    """
+    Open the run journal named by `run_journal_path` in config.yaml.
+
+    Args:
+        config: Configuration dictionary
+        resume: Continue an interrupted run (--resume)
+
+    Returns:
+        RunJournal instance, or None if the journal is disabled
+    """
+    path = config.get('run_journal_path')
+    if not path:
+        if resume:
+            logging.warning("--resume needs run_journal_path in config.yaml; starting a new run")
+        return None
+    mode = 'links' if config.get('update_paper_links') else 'daily'
+    try:
+        return RunJournal(path, mode, resume=resume)
+    except OSError as e:
+        logging.warning(f"Could not open run journal {path}: {e}")
+        return None
@@ -0,0 +1,222 @@
+"""
+AI4Sarcopenia Literature Daily - Run instrumentation and timing report
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Records what a run spends its time on: wall time per pipeline stage,
+requests per host (count, errors, retries, latency percentiles, bytes,
+time spent waiting for the host's rate limit), time and result count of
+every search stream, and cache hit rates. The report is written as JSON
+under .cache (it changes on every run, so it is not committed with the
+docs) and can be printed as a summary table (--print_report).
+"""
+
+import math
+import time
+import json
+import datetime
+import threading
+import contextlib
+from urllib.parse import urlsplit
+
+from paper_store import atomic_write
+
+
+def percentile(values, q):
+    """Nearest-rank percentile q (0-100) of a list of numbers, 0 if empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q / 100 * len(ordered))) - 1]
+
+
+class RunReport:
+    """Thread-safe collector of the measurements of one run."""
+
+    def __init__(self):
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self.stages = dict()      # stage -> seconds
+        self.hosts = dict()       # host -> request statistics
+        self.searches = dict()    # search label -> {'seconds', 'results'}
+        self.caches = dict()      # cache name -> {'hits', 'misses'}
+        self.counters = dict()    # name -> count
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Add the wall time of the with-block to a pipeline stage."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def _host(self, url):
+        host = urlsplit(url).hostname or url
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = {'requests': 0, 'errors': 0, 'retries': 0, 'bytes': 0, 'wait': 0.0,
+                     'latencies': []}
+            self.hosts[host] = stats
+        return stats
+
+    def record_request(self, url, seconds, status, nbytes=0):
+        """Record one HTTP response (error statuses count as errors)."""
+        with self._lock:
+            stats = self._host(url)
+            stats['requests'] += 1
+            stats['latencies'].append(seconds)
+            stats['bytes'] += nbytes
+            if status >= 400:
+                stats['errors'] += 1
+
+    def record_error(self, url):
+        """Record a request that failed without a response (connection error, timeout)."""
+        with self._lock:
+            stats = self._host(url)
+            stats['requests'] += 1
+            stats['errors'] += 1
+
+    def record_retry(self, url):
+        with self._lock:
+            self._host(url)['retries'] += 1
+
+    def record_wait(self, url, seconds):
+        """Record time a request waited for its host's rate limit."""
+        with self._lock:
+            self._host(url)['wait'] += seconds
+
+    def record_search(self, label, seconds, results):
+        with self._lock:
+            entry = self.searches.setdefault(label, {'seconds': 0.0, 'results': 0})
+            entry['seconds'] += seconds
+            entry['results'] += results
+
+    def record_cache(self, name, hits, misses):
+        with self._lock:
+            self.caches[name] = {'hits': hits, 'misses': misses}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        """The report as a JSON-serializable dictionary (times in seconds, latencies in ms)."""
+        with self._lock:
+            hosts = dict()
+            for host, stats in sorted(self.hosts.items()):
+                latencies = stats['latencies']
+                hosts[host] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'bytes': stats['bytes'],
+                    'wait_seconds': round(stats['wait'], 2),
+                    'latency_ms': {'p50': round(percentile(latencies, 50) * 1000),
+                                   'p95': round(percentile(latencies, 95) * 1000),
+                                   'max': round(max(latencies, default=0) * 1000)},
+                }
+            caches = dict()
+            for name, stats in self.caches.items():
+                total = stats['hits'] + stats['misses']
+                caches[name] = {**stats, 'hit_rate': round(stats['hits'] / total, 3) if total else None}
+            return {
+                'started': self.started.isoformat(timespec='seconds'),
+                'seconds': round(time.monotonic() - self._start, 2),
+                'stages': {name: round(seconds, 2) for name, seconds in self.stages.items()},
+                'hosts': hosts,
+                'searches': {label: {'seconds': round(entry['seconds'], 2),
+                                     'results': entry['results']}
+                             for label, entry in self.searches.items()},
+                'caches': caches,
+                'counters': dict(self.counters),
+            }
+
+    def write(self, filename):
+        """Write the report as JSON (atomically)."""
+        with atomic_write(filename) as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        """The report as plain-text tables."""
+        report = self.to_dict()
+        lines = [f"Run report {report['started']} ({report['seconds']:.1f}s)", "",
+                 f"{'Stage':<32}{'Seconds':>10}"]
+        lines += [f"{name:<32}{seconds:>10.2f}" for name, seconds in report['stages'].items()]
+
+        lines += ["", f"{'Host':<32}{'Requests':>10}{'Errors':>8}{'Retries':>9}"
+                      f"{'p50 ms':>8}{'p95 ms':>8}{'KiB':>9}{'Wait s':>9}"]
+        for host, stats in report['hosts'].items():
+            lines.append(f"{host[:31]:<32}{stats['requests']:>10}{stats['errors']:>8}"
+                         f"{stats['retries']:>9}{stats['latency_ms']['p50']:>8}"
+                         f"{stats['latency_ms']['p95']:>8}{stats['bytes'] / 1024:>9.0f}"
+                         f"{stats['wait_seconds']:>9.1f}")
+
+        lines += ["", f"{'Search':<32}{'Results':>10}{'Seconds':>10}"]
+        for label, entry in sorted(report['searches'].items(),
+                                   key=lambda item: item[1]['seconds'], reverse=True):
+            lines.append(f"{label[:31]:<32}{entry['results']:>10}{entry['seconds']:>10.2f}")
+
+        lines += ["", f"{'Cache':<32}{'Hits':>10}{'Misses':>8}{'Hit rate':>10}"]
+        for name, stats in report['caches'].items():
+            rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else '-'
+            lines.append(f"{name:<32}{stats['hits']:>10}{stats['misses']:>8}{rate:>10}")
+
+        if report['counters']:
+            lines += [""] + [f"{name:<32}{n:>10}" for name, n in report['counters'].items()]
+        return '\n'.join(lines)
+
+
+_current = RunReport()
+
+
+def start_run():
+    """Start a new report for this run and return it."""
+    global _current
+    _current = RunReport()
+    return _current
+
+
+def current():
+    """The report of the current run."""
+    return _current
+
+
+def stage(name):
+    """Time a pipeline stage of the current run (context manager)."""
+    return _current.stage(name)
+
+
+def response_hook(response, *args, **kwargs):
+    """requests response hook recording every HTTP response of a session."""
+    seconds = response.elapsed.total_seconds() - getattr(response, 'rate_limit_wait', 0.0)
+    _current.record_request(response.url, max(0.0, seconds),
+                            response.status_code, len(response.content or b''))
+
+
+def timed(label, iterable):
+    """
+    Iterate over a search stream, recording the time spent fetching its
+    items and their number under label.
+    """
+    iterator = iter(iterable)
+    seconds = 0.0
+    results = 0
+    try:
+        while True:
+            start = time.monotonic()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                seconds += time.monotonic() - start
+            results += 1
+            yield item
+    finally:
+        _current.record_search(label, seconds, results)
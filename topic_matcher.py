@@ -0,0 +1,73 @@
+"""
+AI4Sarcopenia Literature Daily - Local topic classification
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Assigns papers returned by the combined (union) queries to the topics of
+config.yaml by matching the topic filter phrases against title and abstract.
+"""
+
+import re
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens of a text; punctuation and hyphens split words."""
+    return _TOKEN.findall((text or "").lower())
+
+
+class TopicMatcher:
+    """
+    Multi-phrase matcher built once from all topic filters.
+
+    All filter phrases are compiled into a single token trie, so a text is
+    scanned once for every phrase of every topic instead of once per topic.
+    Phrases match on whole words, case-insensitively, and hyphenated or
+    spaced spellings are treated alike ("point-of-care" == "point of care").
+    """
+
+    _TOPICS = object()
+
+    def __init__(self, keywords):
+        """
+        Args:
+            keywords: The `keywords` section of config.yaml
+                (topic -> {'filters': [...]})
+        """
+        self.topics = list(keywords.keys())
+        self._trie = {}
+        self._depth = 0
+        for topic, v in keywords.items():
+            for phrase in v['filters']:
+                tokens = tokenize(phrase)
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(self._TOPICS, set()).add(topic)
+                self._depth = max(self._depth, len(tokens))
+
+    def match(self, *texts):
+        """
+        Find the topics whose filters occur in any of the texts.
+
+        Returns:
+            List of matching topics in config order
+        """
+        found = set()
+        for text in texts:
+            tokens = tokenize(text)
+            for start in range(len(tokens)):
+                node = self._trie
+                for token in tokens[start:start + self._depth]:
+                    node = node.get(token)
+                    if node is None:
+                        break
+                    found.update(node.get(self._TOPICS, ()))
+                if len(found) == len(self.topics):
+                    break
+        return [topic for topic in self.topics if topic in found]
@@ -0,0 +1,197 @@
+"""
+AI4Sarcopenia Literature Daily - Sharded data files for the web frontend
+
+Part of: "Literature Review of AI-Driven Body Shape Analysis for Sarcopenia"
+Authors: Aizierjiang Aierislan
+Institute for Innovation in Health Computing, The George Washington University
+
+Splits the paper store into one compact JSON file per topic and month plus a
+small manifest, so pages only download the shards they display:
+
+    <out_dir>/manifest.json
+    <out_dir>/<topic-slug>/<YYYY-MM>.json
+
+and builds the prebuilt inverted index used by the in-page search.
+"""
+
+import os
+import re
+import json
+import logging
+
+from paper_store import atomic_write
+from topic_matcher import tokenize
+
+MANIFEST = 'manifest.json'
+
+# Shard file name; only files of this form are ever removed
+SHARD_NAME = re.compile(r'^\d{4}-\d{2}\.json$')
+
+# Fields left out of the shards (not displayed by the pages)
+SHARD_EXCLUDE = ('abstract',)
+
+# Words too common to be worth a postings list; the page skips them too
+STOPWORDS = (
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'we', 'were', 'with',
+)
+
+
+def slugify(name):
+    """URL- and file-safe slug of a topic name ("DXA & BIA Analysis" -> "dxa-bia-analysis")."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def compact_record(record):
+    """Drop empty and undisplayed fields of a record to keep shards small."""
+    return {k: v for k, v in record.items()
+            if v not in (None, '') and k not in SHARD_EXCLUDE}
+
+
+def write_json(filename, data):
+    """Write compact JSON atomically (unchanged files are not rewritten)."""
+    with atomic_write(filename) as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_shards(data, out_dir):
+    """
+    Write per-topic / per-month shards and the manifest describing them.
+
+    Shards are sorted newest first. Shards of months or topics that no
+    longer exist are removed: only YYYY-MM.json files in the topic
+    directories of this manifest or the previous one, so other files in
+    out_dir are never touched.
+
+    Args:
+        data: Paper store, topic -> {paper key: record}
+        out_dir: Output directory (e.g. ./docs/data)
+
+    Returns:
+        The manifest dictionary
+
+    Raises:
+        ValueError: if two topics have the same slug (shard directory), or
+            a topic name has no letters or digits
+    """
+    slugs = dict()
+    for topic in data:
+        slug = slugify(topic)
+        if not slug:
+            raise ValueError(f"Topic '{topic}' has no letters or digits for its shard directory")
+        if slug in slugs:
+            raise ValueError(f"Topics '{slugs[slug]}' and '{topic}' share the shard "
+                             f"directory '{slug}'; rename one of them")
+        slugs[slug] = topic
+
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    managed = set(slugs)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = [entry.get('slug') for entry in json.load(f).get('topics', [])]
+        # Only names a slug can have, never '..' or paths
+        managed.update(slug for slug in previous if slug and slugify(slug) == slug)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    manifest = {'latest': '', 'total': 0, 'topics': []}
+    written = set()
+
+    for topic, papers in data.items():
+        slug = slugify(topic)
+        months = dict()
+        for record in papers.values():
+            months.setdefault(record['date'][:7], []).append(record)
+
+        entry = {'name': topic, 'slug': slug, 'count': len(papers), 'months': []}
+        for month in sorted(months, reverse=True):
+            records = sorted(months[month], key=lambda r: (r['date'], r['id']), reverse=True)
+            path = f"{slug}/{month}.json"
+            write_json(os.path.join(out_dir, path), [compact_record(r) for r in records])
+            written.add(os.path.normpath(path))
+            entry['months'].append({'month': month, 'count': len(records), 'file': path})
+            manifest['latest'] = max(manifest['latest'], records[0]['date'])
+
+        manifest['total'] += len(papers)
+        manifest['topics'].append(entry)
+
+    write_json(manifest_path, manifest)
+
+    # Remove shards that are no longer referenced by the manifest
+    for slug in managed:
+        directory = os.path.join(out_dir, slug)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if SHARD_NAME.match(name) and os.path.normpath(f"{slug}/{name}") not in written:
+                os.remove(os.path.join(directory, name))
+        if not os.listdir(directory):
+            os.rmdir(directory)
+
+    logging.info(f"Wrote {len(written)} shards for {len(manifest['topics'])} topics to {out_dir}")
+    return manifest
+
+
+def build_search_index(data):
+    """
+    Build an inverted index over title, first author and abstract tokens.
+
+    Papers listed under several topics appear once. Documents are ordered
+    newest first, so postings (ascending document numbers) are already in
+    display order. Layout:
+
+        {"version": 1,
+         "stopwords": [...],
+         "topics": [topic, ...],
+         "docs": [[id, date, title, first_author, url, code_url, [topic no, ...]], ...],
+         "terms": {token: [doc no, delta, delta, ...]}}
+
+    Postings are delta-encoded to keep the file small; tokens follow
+    topic_matcher.tokenize (lowercase [a-z0-9]+ words).
+
+    Args:
+        data: Paper store, topic -> {paper key: record}
+
+    Returns:
+        Index dictionary
+    """
+    topics = list(data.keys())
+    papers = dict()
+    for topic_no, topic in enumerate(topics):
+        for key, record in data[topic].items():
+            entry = papers.setdefault(key, (record, []))
+            entry[1].append(topic_no)
+
+    ordered = sorted(papers.values(), key=lambda e: (e[0]['date'], e[0]['id']), reverse=True)
+    stopwords = set(STOPWORDS)
+    docs = []
+    postings = dict()
+    for doc_no, (record, topic_nos) in enumerate(ordered):
+        docs.append([record['id'], record['date'], record['title'], record['first_author'],
+                     record['url'], record.get('code_url') or '', topic_nos])
+        text = ' '.join(filter(None, (record['title'], record['first_author'],
+                                      record.get('abstract'))))
+        for token in set(tokenize(text)) - stopwords:
+            postings.setdefault(token, []).append(doc_no)
+
+    terms = dict()
+    for token in sorted(postings):
+        doc_nos = postings[token]
+        terms[token] = [doc_nos[0]] + [b - a for a, b in zip(doc_nos, doc_nos[1:])]
+
+    return {'version': 1, 'stopwords': list(STOPWORDS), 'topics': topics,
+            'docs': docs, 'terms': terms}
+
+
+def write_search_index(data, filename):
+    """
+    Write the search index of a paper store (see build_search_index).
+
+    Returns:
+        The index dictionary
+    """
+    index = build_search_index(data)
+    write_json(filename, index)
+    logging.info(f"Search index {filename}: {len(index['docs'])} papers, "
+                 f"{len(index['terms'])} terms")
+    return index